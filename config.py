@@ -1,6 +1,8 @@
 import os
 import json
 import logging
+import threading
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -52,6 +54,7 @@ LEADS_SHEET = os.getenv('LEADS_SHEET', 'leads')
 MAX_LINKS_PER_SITE = 3
 REQUEST_TIMEOUT = 1800  # 30 minutes for Apollo scraping (was 30 seconds)
 WEBSITE_TIMEOUT = 30  # 30 seconds for website scraping (increased from 7)
+WEBSITE_CONNECT_TIMEOUT = 5  # Seconds to establish a connection before giving up on a site
 MAX_RETRIES = 3
 WEBSITE_MAX_RETRIES = 2  # 2 retries for failed websites (was 0)
 BATCH_SIZE = 25  # Increased from 10 for 2x speedup
@@ -67,9 +70,10 @@ def get_ai_setting(key, default):
     ui_settings = _ui_config.get('settings', {})
     return ui_settings.get(key, default)
 
-AI_MODEL_SUMMARY = get_ai_setting('ai_model_summary', 'gpt-4o-mini')
-AI_MODEL_ICEBREAKER = get_ai_setting('ai_model_icebreaker', 'gpt-4o')
+AI_MODEL_SUMMARY = get_ai_setting('ai_model_summary', os.getenv('AI_MODEL_SUMMARY', 'gpt-4o-mini'))
+AI_MODEL_ICEBREAKER = get_ai_setting('ai_model_icebreaker', os.getenv('AI_MODEL_ICEBREAKER', 'gpt-4o'))
 AI_TEMPERATURE = get_ai_setting('ai_temperature', 0.5)
+AI_BASE_URL = os.getenv('AI_BASE_URL') or None  # OpenAI-compatible endpoint (e.g. self-hosted vLLM http://vllm-host:8000/v1)
 
 # Scheduling
 SCHEDULE_INTERVAL_MINUTES = 15
@@ -81,16 +85,37 @@ DELAY_BETWEEN_AI_CALLS = get_ai_setting('delay_between_ai_calls', 5)  # seconds
 # Concurrency settings for parallel processing
 MAX_WEBSITE_WORKERS = 6  # Increased from 3 for faster website scraping
 MAX_AI_WORKERS = 10  # Aggressive limit for OpenAI API calls
-MAX_CONTACTS_PARALLEL = 10  # Increased from 5 for 2x parallel processing
+MAX_CONTACTS_PARALLEL = int(os.getenv('CONCURRENCY', '10'))  # Bounded contact concurrency - override with CONCURRENCY env
+MAX_SEARCH_URLS_PARALLEL = 4  # Search URLs scraped at once in Stage 1 (each mostly waits on an Apify run)
 ENABLE_PARALLEL_PROCESSING = True  # Master switch for parallel processing
+FUSE_SUMMARY_AND_ICEBREAKER = os.getenv('FUSE_SUMMARY_AND_ICEBREAKER', 'true').lower() == 'true'  # Summarize website + write icebreaker in one AI call
+SUMMARY_PAGES_PER_REQUEST = 4  # Website pages summarized together in one AI request (1 = one request per page)
+PAGE_SUMMARY_CACHE_SIZE = 2000  # Page summaries kept in memory, keyed by page content (identical pages are summarized once)
 
 # OpenAI Rate Limits (requests per minute)
 OPENAI_GPT4_RPM = 10000  # GPT-4o rate limit
 OPENAI_GPT4_MINI_RPM = 30000  # GPT-4o-mini rate limit
+OPENAI_GPT4_TPM = 30000000  # GPT-4o tokens per minute
+OPENAI_GPT4_MINI_TPM = 150000000  # GPT-4o-mini tokens per minute
+OPENAI_MIN_REMAINING_REQUESTS = 5  # Pause OpenAI calls until the limit resets when fewer requests remain
+OPENAI_MIN_REMAINING_TOKENS = 20000  # Same for the tokens-per-minute quota (a large icebreaker prompt is a few thousand)
+OPENAI_LATENCY_TARGET = 10.0  # Seconds; faster OpenAI replies let concurrency grow back toward MAX_AI_WORKERS
+
+# Provider rate limits (requests per second) - token buckets in modules/rate_limiter.py
+APIFY_REQUESTS_PER_SECOND = 5
+APIFY_DATASET_PAGE_SIZE = 250  # Apollo results fetched (and stored) per dataset page
+SUPABASE_REQUESTS_PER_SECOND = 30
 
 # Domain throttling
 DOMAIN_REQUEST_DELAY = 2.0  # Minimum seconds between requests to same domain
+WEBSITE_POOL_CONNECTIONS = 100  # Hosts kept in the scraper's keep-alive connection pool
+WEBSITE_POOL_MAXSIZE = 20  # Keep-alive connections kept per host
 WEBSITE_FAILURE_THRESHOLD = 3  # Mark domain as failed after this many consecutive failures
+WEBSITE_SUMMARY_CACHE_TTL_DAYS = 30  # Cached website summaries older than this are regenerated
+
+# Connection test caching
+HEALTHCHECK_CACHE_FILE = os.path.join(os.path.dirname(__file__), '.healthcheck-cache.json')
+HEALTHCHECK_CACHE_TTL = 300  # Seconds a passed connection test is trusted for the same credentials
 
 # Prompts - Read from UI state
 def get_prompt(prompt_type, default=""):
@@ -239,8 +264,41 @@ Rules:
 # Use dynamic prompt based on organization
 ICEBREAKER_PROMPT = get_organization_prompt()
 
-def reload_config():
-    """Reload configuration from UI state file"""
+# reload_config is called before every AI request; re-read the UI state (and re-fetch the
+# organization prompt from Supabase) at most this often unless the state file changes
+CONFIG_RELOAD_INTERVAL = 60  # seconds
+CONFIG_CHECK_INTERVAL = 1  # seconds between checks of the UI state file's mtime
+_config_loaded_at = None
+_config_checked_at = None
+_config_state_mtime = None
+_config_reload_lock = threading.Lock()
+
+def _ui_state_mtime():
+    try:
+        return os.path.getmtime(UI_STATE_FILE)
+    except OSError:
+        return None
+
+def reload_config(force: bool = False):
+    """Reload configuration from UI state file (skipped if fresh and the file is unchanged, unless forced)"""
+    global _config_loaded_at, _config_checked_at, _config_state_mtime
+
+    # Hot path (every AI call): no lock and no stat while the last check is recent
+    if not force and _config_checked_at is not None and time.monotonic() - _config_checked_at < CONFIG_CHECK_INTERVAL:
+        return
+
+    with _config_reload_lock:
+        state_mtime = _ui_state_mtime()
+        _config_checked_at = time.monotonic()
+        if (not force and _config_loaded_at is not None
+                and state_mtime == _config_state_mtime
+                and _config_checked_at - _config_loaded_at < CONFIG_RELOAD_INTERVAL):
+            return
+        _reload_config()
+        _config_loaded_at = time.monotonic()
+        _config_state_mtime = state_mtime
+
+def _reload_config():
     global _ui_config, APIFY_API_KEY, OPENAI_API_KEY, LINKEDIN_ACTOR_ID, BOUNCER_API_KEY, AI_MODEL_SUMMARY, AI_MODEL_ICEBREAKER, AI_TEMPERATURE, DELAY_BETWEEN_AI_CALLS, SUMMARY_PROMPT, ICEBREAKER_PROMPT
 
     _ui_config = load_ui_config()
@@ -251,8 +309,8 @@ def reload_config():
     LINKEDIN_ACTOR_ID = get_api_key('linkedin_actor_id', 'LINKEDIN_ACTOR_ID', 'bebity~linkedin-premium-actor')
     BOUNCER_API_KEY = get_api_key('bouncer_api_key', 'BOUNCER_API_KEY')
     
-    AI_MODEL_SUMMARY = get_ai_setting('ai_model_summary', 'gpt-4o-mini')
-    AI_MODEL_ICEBREAKER = get_ai_setting('ai_model_icebreaker', 'gpt-4o')
+    AI_MODEL_SUMMARY = get_ai_setting('ai_model_summary', os.getenv('AI_MODEL_SUMMARY', 'gpt-4o-mini'))
+    AI_MODEL_ICEBREAKER = get_ai_setting('ai_model_icebreaker', os.getenv('AI_MODEL_ICEBREAKER', 'gpt-4o'))
     AI_TEMPERATURE = get_ai_setting('ai_temperature', 0.5)
     DELAY_BETWEEN_AI_CALLS = get_ai_setting('delay_between_ai_calls', 5)  # Use fast 5s default
     
@@ -12,28 +12,32 @@ This script replicates the functionality of your n8n workflow:
 
 import sys
 import os
+import hashlib
+import json
 import logging
+import random
+import re
 import time
-from typing import List, Dict, Any
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+import traceback
+import itertools
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed, Future
 
 # Add modules directory to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
 
-try:
-    from sheets_manager import GoogleSheetsManager
-except ImportError:
-    GoogleSheetsManager = None
-from modules.supabase_manager import SupabaseManager
-from modules.apify_scraper import ApifyScraper
+from modules.supabase_manager import SupabaseManager, BackgroundLeadWriter
+from modules.apify_scraper import ApifyScraper, ApifyScrapeError
 from modules.local_business_scraper import LocalBusinessScraper
-from modules.web_scraper import WebScraper
+from modules.web_scraper import WebScraper, canonical_website_key
 from modules.ai_processor import AIProcessor
 import config
 
 # Configure logging
 logging.basicConfig(
-    level=logging.INFO,
+    level=getattr(logging, os.getenv('LOG_LEVEL', 'INFO').upper(), logging.INFO),  # LOG_LEVEL=WARNING for high-throughput runs
     format='%(asctime)s - %(levelname)s - %(message)s',
     handlers=[
         logging.FileHandler('lead_generation.log'),
@@ -41,11 +45,53 @@ logging.basicConfig(
     ]
 )
 
+# Error message fragments that mean the website blocked/throttled us (logged as a warning, not an error)
+_BLOCKED_KEYWORDS = ("cloudflare", "403", "blocked", "429", "captcha")
+_BLOCKED_RE = re.compile("|".join(map(re.escape, _BLOCKED_KEYWORDS)), re.IGNORECASE)
+
+# Apollo search used by `python main.py test` when TEST_APOLLO_URL is not set
+_DEFAULT_APOLLO_TEST_URL = "https://app.apollo.io/#/people?page=1&organizationLocations[]=United%20States&organizationNumEmployeesRanges[]=1%2C10&organizationNumEmployeesRanges[]=51%2C100&organizationNumEmployeesRanges[]=11%2C20&organizationNumEmployeesRanges[]=21%2C50&organizationIndustryTagIds[]=5567cd4773696439b10b0000&organizationIndustryTagIds[]=5567cd4e7369643b70010000&sortByField=%5Bnone%5D&sortAscending=false&personTitles[]=manager&personTitles[]=ceo&personTitles[]=cmo"
+
+# Outside DEBUG, log the full traceback for only every Nth per-contact error
+_TRACEBACK_SAMPLE_EVERY = 50
+
+# Fallback subject line templates ({company} is truncated to 20 chars, {company_short} to 15)
+_SUBJ_COMPANY_TEMPLATES = (
+    "Quick question about {company}",
+    "{first_name}, about {company_short}",
+    "Idea for {company}",
+    "{company} opportunity",
+)
+_SUBJ_NAME_TEMPLATES = (
+    "Quick question, {first_name}",
+    "{first_name}, 30 seconds?",
+    "Idea for you, {first_name}",
+    "Relevant for you, {first_name}",
+)
+
+
+@lru_cache(maxsize=4096)
+def _company_subject_pool(company: str, first_name: str) -> tuple:
+    """Formatted company subject lines (cached: contacts of the same company reuse them)"""
+    company = company[:20]
+    return tuple(
+        template.format(first_name=first_name, company=company, company_short=company[:15])
+        for template in _SUBJ_COMPANY_TEMPLATES
+    )
+
+# Fallback icebreaker templates keyed by (has_headline, has_location)
+_FALLBACK_TEMPLATES = {
+    (True, True): "Hi {first_name},\n\nSaw your profile as {headline} in {location}. Working on something in your space that might be relevant.\n\nWould love to connect and share what we're building.",
+    (True, False): "Hi {first_name},\n\nNoticed your work as {headline}. We're building something that aligns with your expertise.\n\nInterested in a quick chat about potential synergies?",
+    (False, True): "Hi {first_name},\n\nConnecting with professionals in {location}. Working on something that might interest your network.\n\nOpen to a brief conversation?",
+    (False, False): "Hi {first_name},\n\nCame across your profile and thought there might be some interesting overlap with what we're working on.\n\nWould you be open to a brief conversation?",
+}
+
 class LeadGenerationOrchestrator:
     def __init__(self, use_supabase=True, use_sheets=False, organization_id=None):
         """Initialize all components with organization context"""
         # Reload config to get latest UI settings
-        config.reload_config()
+        config.reload_config(force=True)
         logging.info("🎛️  Using configuration from React UI control panel")
         
         # Initialize database managers
@@ -73,7 +119,13 @@ class LeadGenerationOrchestrator:
         else:
             self.supabase_manager = None
         
-        # Legacy Google Sheets support
+        # Legacy Google Sheets support (the Google API client is only imported when requested)
+        GoogleSheetsManager = None
+        if use_sheets:
+            try:
+                from sheets_manager import GoogleSheetsManager
+            except ImportError:
+                pass
         if use_sheets and GoogleSheetsManager:
             try:
                 self.sheets_manager = GoogleSheetsManager(config.GOOGLE_SHEETS_ID)
@@ -86,9 +138,17 @@ class LeadGenerationOrchestrator:
             
         # Core processing components
         self.apify_scraper = ApifyScraper()
-        self.local_scraper = LocalBusinessScraper()
+        self.local_scraper = LocalBusinessScraper(session=self.apify_scraper.session)  # One Apify connection pool
         self.web_scraper = WebScraper()
         self.ai_processor = AIProcessor()  # Will automatically load latest API key
+
+        # Website summaries shared across contacts and batches, keyed by canonical domain.
+        # Each entry is a Future so concurrent contacts on the same site wait for one scrape.
+        self._website_cache: Dict[str, Future] = {}
+        self._website_cache_lock = threading.Lock()
+
+        # Numbers per-contact errors so tracebacks can be sampled
+        self._contact_error_counter = itertools.count()
         
     def run_workflow(self, campaign_id: str = None) -> bool:
         """
@@ -153,123 +213,14 @@ class LeadGenerationOrchestrator:
                 logging.warning("No search URLs available")
                 return False
             
-            total_raw_contacts = 0
             total_processed_leads = 0
             
-            for search_url_data in search_urls:
-                search_url_id = search_url_data['id']
-                search_url = search_url_data['url']
-                
-                logging.info(f"🔍 Stage 1: Scraping raw contacts from: {search_url}")
-                
-                # Update status to running
-                self.supabase_manager.update_search_url_status(search_url_id, "running")
-                
-                try:
-                    # Step 1: Scrape ALL contacts and store raw data immediately
-                    # Get record count from environment (set by server)
-                    record_count = int(os.getenv('RECORD_COUNT', '500'))
-                    
-                    # Check scraper type from environment or URL pattern
-                    scraper_type = os.getenv('SCRAPER_TYPE', 'apollo').lower()
-                    
-                    # Detect scraper type from URL if not specified
-                    if 'apollo.io' in search_url:
-                        scraper_type = 'apollo'
-                    elif 'local:' in search_url:  # Format: "local:query|location"
-                        scraper_type = 'local'
-                    
-                    if scraper_type == 'local':
-                        # Parse local business search parameters
-                        # Enhanced formats:
-                        # "local:hair salons|Austin, TX" - City search
-                        # "local:hair salons|Virginia" - State search
-                        # "local:hair salons|USA" - All 50 states
-                        # "local:hair salons|37.0871,-76.4730|5" - Coordinates with 5 mile radius
-                        if search_url.startswith('local:'):
-                            parts = search_url[6:].split('|')
-                            query = parts[0] if len(parts) > 0 else 'businesses'
-                            location = parts[1] if len(parts) > 1 else 'United States'
-                            
-                            logging.info(f"🗺️ STAGE 1: Local Business Scraping - Starting scrape")
-                            logging.info(f"🔍 Query: {query} in {location}")
-                            logging.info(f"📊 Requesting up to {record_count} businesses")
-                            
-                            # Use the new raw scraping method for immediate database storage
-                            raw_contacts = self.local_scraper.scrape_local_businesses_raw(
-                                search_query=query,
-                                location=location,
-                                max_results=record_count
-                            )
-                        else:
-                            logging.error(f"❌ Invalid local search URL format: {search_url}")
-                            raw_contacts = []
-                    else:
-                        # Default to Apollo scraper
-                        # Enforce minimum for Apollo scraper
-                        if record_count < 500:
-                            logging.info(f"⚠️ Adjusting record count from {record_count} to minimum 500 for Apollo scraper")
-                            record_count = 500
-                        logging.info(f"🔄 STAGE 1: Apollo Scraping - Starting scrape")
-                        logging.info(f"🔍 DEBUG: Starting Apollo scrape for search_url_id={search_url_id}")
-                        logging.info(f"📊 Requesting {record_count} records from Apollo")
-                        logging.info(f"🌐 Apollo URL: {search_url}")
-                        
-                        raw_contacts = self.apify_scraper.scrape_contacts(search_url, total_records=record_count)
-                    
-                    # Log results based on scraper type
-                    if scraper_type == 'local':
-                        logging.info(f"🏪 Local business scrape returned {len(raw_contacts) if raw_contacts else 0} contacts")
-                        if raw_contacts:
-                            logging.info(f"📊 Sample contacts from local scraper:")
-                            for i, contact in enumerate(raw_contacts[:3], 1):
-                                logging.info(f"  {i}. {contact.get('name', 'Unknown')}")
-                                logging.info(f"     Email: {contact.get('email', 'None')}")
-                                logging.info(f"     Status: {contact.get('email_status', 'N/A')}")
-                                logging.info(f"     Website: {'Yes' if contact.get('website_url') else 'No'}")
-                    else:
-                        logging.info(f"🔍 Apollo scrape returned {len(raw_contacts) if raw_contacts else 0} contacts")
-                        if raw_contacts:
-                            logging.info(f"🔍 First contact sample: {raw_contacts[0].keys() if raw_contacts else 'N/A'}")
-                    
-                    if not raw_contacts:
-                        logging.error(f"❌ CRITICAL: No contacts found from {scraper_type} scraper for {search_url}")
-                        self.supabase_manager.update_search_url_status(search_url_id, "failed")
-                        continue
-                    
-                    # Step 2: Store all raw contact data in Supabase
-                    logging.info(f"💾 ATTEMPTING: Storing {len(raw_contacts)} raw contacts in database")
-                    logging.info(f"🔍 DEBUG: About to call batch_insert_raw_contacts with search_url_id={search_url_id}")
-                    
-                    try:
-                        stored_count = self.supabase_manager.batch_insert_raw_contacts(raw_contacts, search_url_id)
-                        logging.info(f"🔍 DEBUG: batch_insert_raw_contacts returned: {stored_count}")
-                        total_raw_contacts += stored_count
-                        
-                        if stored_count > 0:
-                            # Update search URL with results
-                            self.supabase_manager.update_search_url_status(
-                                search_url_id, "completed", stored_count
-                            )
-                            logging.info(f"✅ SUCCESSFULLY Stored {stored_count} raw contacts from {search_url}")
-                        else:
-                            logging.error(f"❌ CRITICAL: batch_insert_raw_contacts returned 0 - database insertion failed!")
-                            self.supabase_manager.update_search_url_status(search_url_id, "failed")
-                            continue
-                            
-                    except Exception as db_error:
-                        logging.error(f"❌ CRITICAL: Database insertion exception: {db_error}")
-                        logging.error(f"🔍 DEBUG: Exception type: {type(db_error)}")
-                        self.supabase_manager.update_search_url_status(search_url_id, "failed")
-                        continue
-                    
-                    # Rate limiting between search URLs
-                    time.sleep(config.DELAY_BETWEEN_REQUESTS)
-                    
-                except Exception as e:
-                    logging.error(f"❌ Failed to process search URL {search_url}: {e}")
-                    self.supabase_manager.update_search_url_status(search_url_id, "failed")
-                    continue
+            # Scrapes mostly wait on Apify runs, so several search URLs are scraped at once
+            total_raw_contacts = 0
+            max_workers = min(config.MAX_SEARCH_URLS_PARALLEL, len(search_urls))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for stored_count in executor.map(self._scrape_search_url, search_urls):
+                    total_raw_contacts += stored_count
             
             # Stage 1.5: Enrich Google Maps contacts with emails (if needed)
             logging.info(f"🔍 Checking for Google Maps contacts needing email enrichment...")
@@ -307,6 +258,136 @@ class LeadGenerationOrchestrator:
                     logging.error(f"Failed to update campaign status to failed: {status_error}")
             return False
     
+    def _scrape_search_url(self, search_url_data: Dict[str, Any]) -> int:
+        """
+        Stage 1 for one search URL: scrape its contacts and store them as raw contacts
+        Returns the number of raw contacts stored
+        """
+        search_url_id = search_url_data['id']
+        search_url = search_url_data['url']
+        
+        logging.info(f"🔍 Stage 1: Scraping raw contacts from: {search_url}")
+        
+        # Update status to running
+        self.supabase_manager.update_search_url_status(search_url_id, "running")
+        
+        try:
+            # Step 1: Scrape ALL contacts and store raw data immediately
+            # Get record count from environment (set by server)
+            record_count = int(os.getenv('RECORD_COUNT', '500'))
+            
+            # Check scraper type from environment or URL pattern
+            scraper_type = os.getenv('SCRAPER_TYPE', 'apollo').lower()
+            
+            # Detect scraper type from URL if not specified
+            if 'apollo.io' in search_url:
+                scraper_type = 'apollo'
+            elif 'local:' in search_url:  # Format: "local:query|location"
+                scraper_type = 'local'
+            
+            if scraper_type == 'local':
+                # Parse local business search parameters
+                # Enhanced formats:
+                # "local:hair salons|Austin, TX" - City search
+                # "local:hair salons|Virginia" - State search
+                # "local:hair salons|USA" - All 50 states
+                # "local:hair salons|37.0871,-76.4730|5" - Coordinates with 5 mile radius
+                if search_url.startswith('local:'):
+                    parts = search_url[6:].split('|')
+                    query = parts[0] if len(parts) > 0 else 'businesses'
+                    location = parts[1] if len(parts) > 1 else 'United States'
+                    
+                    logging.info(f"🗺️ STAGE 1: Local Business Scraping - Starting scrape")
+                    logging.info(f"🔍 Query: {query} in {location}")
+                    logging.info(f"📊 Requesting up to {record_count} businesses")
+                    
+                    # Use the new raw scraping method for immediate database storage
+                    raw_contacts = self.local_scraper.scrape_local_businesses_raw(
+                        search_query=query,
+                        location=location,
+                        max_results=record_count
+                    )
+                else:
+                    logging.error(f"❌ Invalid local search URL format: {search_url}")
+                    raw_contacts = []
+                
+                logging.info(f"🏪 Local business scrape returned {len(raw_contacts) if raw_contacts else 0} contacts")
+                if raw_contacts:
+                    logging.info(f"📊 Sample contacts from local scraper:")
+                    for i, contact in enumerate(raw_contacts[:3], 1):
+                        logging.info(f"  {i}. {contact.get('name', 'Unknown')}")
+                        logging.info(f"     Email: {contact.get('email', 'None')}")
+                        logging.info(f"     Status: {contact.get('email_status', 'N/A')}")
+                        logging.info(f"     Website: {'Yes' if contact.get('website_url') else 'No'}")
+                contact_pages = [raw_contacts] if raw_contacts else []
+            else:
+                # Default to Apollo scraper
+                # Enforce minimum for Apollo scraper
+                if record_count < 500:
+                    logging.info(f"⚠️ Adjusting record count from {record_count} to minimum 500 for Apollo scraper")
+                    record_count = 500
+                logging.info(f"🔄 STAGE 1: Apollo Scraping - Starting scrape")
+                logging.info(f"🔍 DEBUG: Starting Apollo scrape for search_url_id={search_url_id}")
+                logging.info(f"📊 Requesting {record_count} records from Apollo")
+                logging.info(f"🌐 Apollo URL: {search_url}")
+                
+                # Apollo results arrive page by page and are stored as they come in
+                contact_pages = self.apify_scraper.iter_contact_pages(search_url, total_records=record_count)
+            
+            # Step 2: Store all raw contact data in Supabase
+            try:
+                scraped_count, stored_count = self._store_raw_contact_pages(contact_pages, search_url_id)
+            except ApifyScrapeError as scrape_error:
+                # Pages stored before the failure stay in raw_contacts; a retry upserts them again
+                # on (apollo_id, search_url_id), so they aren't duplicated
+                logging.error(f"❌ Apollo scrape failed partway through for {search_url}: {scrape_error}")
+                self.supabase_manager.update_search_url_status(search_url_id, "failed")
+                return 0
+            except Exception as db_error:
+                logging.error(f"❌ CRITICAL: Database insertion exception: {db_error}")
+                logging.error(f"🔍 DEBUG: Exception type: {type(db_error)}")
+                self.supabase_manager.update_search_url_status(search_url_id, "failed")
+                return 0
+            
+            if not scraped_count:
+                logging.error(f"❌ CRITICAL: No contacts found from {scraper_type} scraper for {search_url}")
+                self.supabase_manager.update_search_url_status(search_url_id, "failed")
+                return 0
+            
+            if stored_count > 0:
+                # Update search URL with results
+                self.supabase_manager.update_search_url_status(
+                    search_url_id, "completed", stored_count
+                )
+                logging.info(f"✅ SUCCESSFULLY Stored {stored_count} raw contacts from {search_url}")
+                return stored_count
+            else:
+                logging.error(f"❌ CRITICAL: batch_insert_raw_contacts returned 0 - database insertion failed!")
+                self.supabase_manager.update_search_url_status(search_url_id, "failed")
+                return 0
+            
+        except Exception as e:
+            logging.error(f"❌ Failed to process search URL {search_url}: {e}")
+            self.supabase_manager.update_search_url_status(search_url_id, "failed")
+            return 0
+    
+    def _store_raw_contact_pages(self, contact_pages: Iterable[List[Dict[str, Any]]], search_url_id: str) -> Tuple[int, int]:
+        """
+        Insert scraped contacts into raw_contacts one page at a time
+
+        Returns:
+            Tuple of (contacts scraped, contacts stored)
+        """
+        scraped_count = 0
+        stored_count = 0
+        for page in contact_pages:
+            if not page:
+                continue
+            scraped_count += len(page)
+            logging.info(f"💾 ATTEMPTING: Storing {len(page)} raw contacts in database ({scraped_count} scraped so far)")
+            stored_count += self.supabase_manager.batch_insert_raw_contacts(page, search_url_id)
+        return scraped_count, stored_count
+    
     def _enrich_google_maps_contacts(self) -> int:
         """
         Stage 1.5: Enrich Google Maps contacts that have websites but no emails
@@ -328,9 +409,8 @@ class LeadGenerationOrchestrator:
             logging.info(f"📧 Found {len(contacts)} Google Maps contacts for quick enrichment (max {MAX_CONTACTS_TO_ENRICH})")
             logging.info(f"⏱️ Time budget: {MAX_ENRICHMENT_TIME} seconds")
             
-            # Import web scraper for email extraction
-            from modules.web_scraper import WebScraper
-            web_scraper = WebScraper()
+            # Reuse the orchestrator's scraper (and its pooled connections) for email extraction
+            web_scraper = self.web_scraper
             
             enriched_count = 0
             guessed_count = 0
@@ -361,7 +441,7 @@ class LeadGenerationOrchestrator:
                         # Update contact with found email
                         if self.supabase_manager.update_contact_email(contact['id'], email, 'verified'):
                             enriched_count += 1
-                            logging.info(f"  ✅ {contact_name}: Found {email}")
+                            logging.info("  ✅ %s: Found %s", contact_name, email)
                             email_found = True
                         
                 except Exception as e:
@@ -370,10 +450,7 @@ class LeadGenerationOrchestrator:
                 
                 # If no email found, just skip this contact
                 if not email_found:
-                    logging.info(f"  ⏭️  {contact_name}: No email found, skipping")
-                
-                # Minimal delay to avoid overwhelming
-                time.sleep(0.5)
+                    logging.info("  ⏭️  %s: No email found, skipping", contact_name)
             
             logging.info(f"✅ Enrichment complete: Found {enriched_count} verified emails")
             logging.info(f"⏱️ Time spent: {int(time.time() - start_time)} seconds")
@@ -392,272 +469,489 @@ class LeadGenerationOrchestrator:
         Returns:
             int: Number of leads successfully generated
         """
-        # Check if parallel processing is enabled
+        # Check if parallel processing is enabled (sequential runs the same pipeline with one
+        # worker, and still re-raises batch errors instead of returning the partial count)
         if config.ENABLE_PARALLEL_PROCESSING:
-            return self._process_raw_contacts_parallel()
-        else:
-            return self._process_raw_contacts_sequential()
+            return self._process_raw_contact_batches(config.MAX_CONTACTS_PARALLEL)
+        return self._process_raw_contact_batches(1, raise_errors=True)
     
-    def _process_raw_contacts_parallel(self) -> int:
+    def _process_raw_contact_batches(self, workers: int, raise_errors: bool = False) -> int:
         """
-        Process contacts in parallel using ThreadPoolExecutor
+        Process contacts batch by batch on a ThreadPoolExecutor
+
+        A single bounded pool (MAX_CONTACTS_PARALLEL workers, tunable with the
+        CONCURRENCY env var, or 1 when parallel processing is off) is shared by
+        every batch so the I/O-bound scrape -> AI -> insert work overlaps without
+        re-spawning threads per batch. Leads are written by a BackgroundLeadWriter
+        so database round trips don't hold up the next batch.
+
+        Args:
+            workers: Contacts researched at once (1 = sequential)
+            raise_errors: Re-raise a batch-level error (after the queued leads are written)
+                          instead of logging it and returning the leads created so far
         """
         total_leads_created = 0
         batch_number = 1
-        
+        last_contact_id = None
+        lead_writer = BackgroundLeadWriter(self.supabase_manager)
+
         try:
-            while True:
-                # Get next batch of unprocessed contacts
-                logging.info(f"📋 Batch {batch_number}: Fetching {config.BATCH_SIZE} unprocessed contacts...")
-                unprocessed_contacts = self.supabase_manager.get_unprocessed_contacts(
-                    limit=config.BATCH_SIZE,
-                    min_confidence=0.7
-                )
-                
-                if not unprocessed_contacts:
-                    logging.info(f"✅ No more unprocessed contacts found. Completed all batches!")
-                    break
-                
-                logging.info(f"📊 Batch {batch_number}: Processing {len(unprocessed_contacts)} contacts in PARALLEL")
-                logging.info(f"⚡ Using {config.MAX_CONTACTS_PARALLEL} parallel workers")
-                
-                batch_leads_created = 0
-                
-                # Process contacts in parallel
-                with ThreadPoolExecutor(max_workers=config.MAX_CONTACTS_PARALLEL) as executor:
-                    # Submit all contact processing tasks
-                    future_to_contact = {}
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                while True:
+                    # Get next batch of unprocessed contacts, continuing after the previous batch
+                    # (its leads may still be waiting in the writer queue)
+                    logging.info(f"📋 Batch {batch_number}: Fetching {config.BATCH_SIZE} unprocessed contacts...")
+                    unprocessed_contacts, last_contact_id = self.supabase_manager.get_unprocessed_contacts_page(
+                        limit=config.BATCH_SIZE,
+                        min_confidence=0.7,
+                        after_id=last_contact_id
+                    )
+
+                    if not unprocessed_contacts:
+                        logging.info(f"✅ No more unprocessed contacts found. Completed all batches!")
+                        break
+
+                    logging.info(f"📊 Batch {batch_number}: Processing {len(unprocessed_contacts)} contacts")
+                    logging.info(f"⚡ Using {workers} parallel workers")
+
+                    total_contacts = len(unprocessed_contacts)
+
+                    # Phase 0: fetch every uncached website of the batch up front
+                    website_urls = self._uncached_website_urls(unprocessed_contacts)
+                    logging.info(f"🌐 Batch {batch_number}: Scraping {len(set(website_urls))} websites")
+                    batch_websites = {
+                        canonical_website_key(url): website_data
+                        for url, website_data in self.web_scraper.scrape_websites(
+                            website_urls, max_workers=workers
+                        ).items()
+                    }
+
+                    # Phase 1: summarize every contact's website in parallel
+                    future_to_index = {}
                     for i, contact in enumerate(unprocessed_contacts, 1):
                         if not isinstance(contact, dict):
                             logging.error(f"Invalid contact type: {type(contact)}")
                             continue
-                        
+
                         future = executor.submit(
-                            self._process_single_contact,
-                            contact, batch_number, i, len(unprocessed_contacts)
+                            self._research_contact,
+                            contact, batch_number, i, total_contacts,
+                            batch_websites.get(canonical_website_key(contact.get('website_url')))
                         )
-                        future_to_contact[future] = contact
-                    
-                    # Collect results as they complete
-                    for future in as_completed(future_to_contact):
-                        contact = future_to_contact[future]
+                        future_to_index[future] = i
+
+                    researched = []
+                    for future in as_completed(future_to_index):
+                        index = future_to_index[future]
+                        contact = unprocessed_contacts[index - 1]
                         try:
-                            lead_created = future.result()
-                            if lead_created:
-                                batch_leads_created += 1
+                            prepared = future.result()
+                            if prepared:
+                                researched.append((index, contact, prepared))
                         except Exception as e:
-                            logging.error(f"Error processing contact {contact.get('name', 'Unknown')}: {e}")
-                
-                total_leads_created += batch_leads_created
-                logging.info(f"✅ Batch {batch_number} completed: {batch_leads_created} leads created")
-                
-                batch_number += 1
-                
-                # Optional: Add a small delay between batches to prevent overwhelming the system
-                if batch_number > 1:
-                    time.sleep(2)
-            
-            return total_leads_created
-            
-        except Exception as e:
-            logging.error(f"❌ Error in parallel contact processing: {e}")
-            return total_leads_created
-    
-    def _process_raw_contacts_sequential(self) -> int:
-        """
-        Original sequential processing method (fallback)
-        """
-        total_leads_created = 0
-        batch_number = 1
-        
-        try:
-            logging.info(f"🚀 Starting batch processing loop...")
-            while True:
-                # Get next batch of unprocessed contacts that meet quality criteria
-                logging.info(f"📋 Processing Batch {batch_number}: Fetching {config.BATCH_SIZE} unprocessed contacts...")
-                logging.info(f"🔍 Calling get_unprocessed_contacts with limit={config.BATCH_SIZE}, organization_id={self.supabase_manager.organization_id}")
-                unprocessed_contacts = self.supabase_manager.get_unprocessed_contacts(
-                    limit=config.BATCH_SIZE,  # Process in manageable batches
-                    min_confidence=0.7  # Only high-confidence emails
-                )
-                
-                logging.info(f"🔍 get_unprocessed_contacts returned: {len(unprocessed_contacts) if unprocessed_contacts else 0} contacts")
-                
-                if not unprocessed_contacts:
-                    logging.info(f"✅ No more unprocessed contacts found. Completed all batches!")
-                    logging.info(f"📊 Final stats: {total_leads_created} total leads created from {batch_number - 1} batches")
-                    break
-                
-                logging.info(f"📊 Batch {batch_number}: Found {len(unprocessed_contacts)} qualified contacts to process")
-                
-                batch_leads_created = 0
-                
-                # Process each contact in this batch
-                for i, contact in enumerate(unprocessed_contacts, 1):
-                    lead_created = self._process_single_contact(contact, batch_number, i, len(unprocessed_contacts))
-                    if lead_created:
-                        batch_leads_created += 1
-                
-                total_leads_created += batch_leads_created
-                logging.info(f"✅ Batch {batch_number}: {batch_leads_created}/{len(unprocessed_contacts)} leads created")
-                logging.info(f"📈 Total progress: {total_leads_created} leads created so far")
-                
-                batch_number += 1
-                logging.info(f"🔄 Moving to batch {batch_number}...")
-                
-                # Rate limiting between batches
-                if batch_number > 1:
-                    logging.info(f"⏱️ Rate limiting: Waiting 2 seconds before next batch...")
-                    time.sleep(2)
-                    logging.info(f"▶️ Continuing with batch {batch_number}")
-                    
+                            self._log_contact_error(contact, e)
+                    researched.sort(key=lambda item: item[0])
+
+                    # Phase 2: generate the batch's icebreakers in one call (contacts with nothing for the
+                    # AI to work from get the template fallback). Contacts whose domain summary is being
+                    # written by another contact's fused call go in a second call once it's known
+                    icebreaker_responses = [None] * len(researched)
+                    waiting = [k for k, (_, _, prepared) in enumerate(researched) if prepared['pending_website']]
+                    first_round = [k for k, (_, _, prepared) in enumerate(researched) if not prepared['pending_website']]
+                    self._generate_icebreakers(batch_number, researched, first_round, icebreaker_responses)
+                    for k in first_round:
+                        self._remember_website_summaries(researched[k][2], icebreaker_responses[k])
+                    if waiting:
+                        for k in waiting:
+                            self._apply_pending_website(researched[k][2])
+                        self._generate_icebreakers(batch_number, researched, waiting, icebreaker_responses)
+
+                    # Phase 3: hand the leads to the background writer (bulk upsert + bulk mark processed)
+                    processing_settings = self._processing_settings()
+                    batch_leads_queued = 0
+                    for (index, contact, prepared), icebreaker_response in zip(researched, icebreaker_responses):
+                        try:
+                            lead_data = self._build_lead_data(contact, prepared, icebreaker_response)
+                            lead_writer.submit(self.supabase_manager.build_processed_lead_row(
+                                contact['id'], contact['search_url_id'], lead_data, processing_settings
+                            ))
+                            batch_leads_queued += 1
+                        except Exception as e:
+                            self._log_contact_error(contact, e)
+
+                    logging.info(f"✅ Batch {batch_number} completed: {batch_leads_queued} leads queued for storage, "
+                                 f"{total_contacts - batch_leads_queued} contacts skipped or failed")
+
+                    batch_number += 1
+
         except Exception as e:
-            import traceback
             logging.error(f"❌ Error processing batch {batch_number}: {e}")
-            logging.error(f"❌ Exception type: {type(e).__name__}")
             logging.error(f"❌ Full traceback:\n{traceback.format_exc()}")
-            logging.error(f"📊 Progress before error: {total_leads_created} leads created from {batch_number - 1} completed batches")
-            # Don't silently continue - re-raise to make the error visible
-            raise
-        
+            if raise_errors:
+                # Don't silently continue - re-raise to make the error visible
+                raise
+
+        finally:
+            # Wait for the remaining queued leads to be written
+            total_leads_created = lead_writer.close()
+            logging.info(f"💾 Stored {total_leads_created} leads in database")
+
         return total_leads_created
     
-    def _process_single_contact(self, contact: dict, batch_number: int, contact_index: int, total_contacts: int) -> bool:
+    def _research_contact(self, contact: dict, batch_number: int, contact_index: int, total_contacts: int,
+                          website_data: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
         """
-        Process a single contact into a lead
-        Returns True if lead was successfully created
+        Scrape and summarize a contact's website and build the icebreaker input
+
+        Args:
+            website_data: Already-fetched scrape result for the contact's website (skips the scrape)
+
+        Returns:
+            Dict with 'contact_info', 'website_url', 'content_summaries' and
+            'website_failed', or None if the contact is unusable
         """
-        try:
-            # Debug contact data structure
-            if not isinstance(contact, dict):
-                logging.error(f"❌ CRITICAL: Contact is not a dictionary, it's {type(contact)}: {contact}")
-                return False
-                
-            logging.info(f"🤖 [{batch_number}.{contact_index}/{total_contacts}] Processing: {contact.get('name', 'Unknown')} ({contact.get('email', 'No email')})")
-            logging.info(f"📍 Progress: Batch {batch_number}, Contact {contact_index} of {total_contacts}")
-            logging.info(f"🔄 STAGE 2: Processing contact {contact_index} of {total_contacts} - Researching websites")
-            
-            # Check if contact already has website summaries (from local business scraper)
-            if contact.get('website_summaries'):
-                logging.info(f"✅ Using pre-scraped website summaries from local business scraper")
-                content_summaries = contact.get('website_summaries', [])
-                website_url = contact.get('website_url', '')
-                website_failed = False
+        # Debug contact data structure
+        if not isinstance(contact, dict):
+            logging.error("❌ CRITICAL: Contact is not a dictionary, it's %s: %s", type(contact), contact)
+            return None
+
+        # Read the contact's fields once up front
+        name = contact.get('name', 'Unknown')
+        website_url = contact.get('website_url', '')
+        pre_scraped_summaries = contact.get('website_summaries')
+
+        logging.info("🤖 [%s.%s/%s] Processing: %s (%s)", batch_number, contact_index, total_contacts, name, contact.get('email', 'No email'))
+        logging.debug("🔄 STAGE 2: Processing contact %s of %s - Researching websites", contact_index, total_contacts)
+
+        website_failed = False
+
+        # Check if contact already has website summaries (from local business scraper)
+        if pre_scraped_summaries:
+            logging.info("✅ Using pre-scraped website summaries from local business scraper")
+            content_summaries = pre_scraped_summaries
+        else:
+            content_summaries = []
+
+        # Step 1: Scrape and summarize website if not already done
+        website_pages = []
+        website_future = None
+        pending_website = None
+        if website_url and not content_summaries and config.FUSE_SUMMARY_AND_ICEBREAKER:
+            # Pages are summarized by the icebreaker call itself, unless the domain is already cached.
+            # Only the first contact per domain sends them; the others wait for its summary
+            key = canonical_website_key(website_url)
+            with self._website_cache_lock:
+                known_future = self._website_cache.get(key)
+                if known_future is None:
+                    website_future = Future()
+                    self._website_cache[key] = website_future
+
+            if known_future is not None and known_future.done():
+                content_summaries = self._future_summaries(known_future)
+                website_failed = not content_summaries
+            elif known_future is not None:
+                logging.info("♻️ [%s.%s] Waiting for the website summary of %s", batch_number, contact_index, key)
+                pending_website = known_future
             else:
-                # Extract website and research it
-                website_url = contact.get('website_url', '')
-                content_summaries = []
-                website_failed = False
-            
-            # Step 1: Scrape and summarize website if not already done
-            if website_url and not content_summaries:
-                logging.info(f"🌐 [{batch_number}.{contact_index}] Scraping website: {website_url}")
                 try:
-                    website_data = self.web_scraper.scrape_website_content(website_url)
-                    page_summaries = website_data.get('summaries', [])
-                    
-                    if page_summaries:
-                        # Step 2: Generate AI summaries of website content  
-                        logging.info(f"🧠 [{batch_number}.{contact_index}] Generating AI summaries for website content")
-                        logging.info(f"🔍 DEBUG: page_summaries type: {type(page_summaries)}, length: {len(page_summaries) if hasattr(page_summaries, '__len__') else 'N/A'}")
-                        content_summaries = self.ai_processor.summarize_website_pages(page_summaries)
-                        logging.info(f"🔍 DEBUG: content_summaries type: {type(content_summaries)}, length: {len(content_summaries) if hasattr(content_summaries, '__len__') else 'N/A'}")
-                    else:
-                        logging.warning(f"⚠️ Website scraping failed for {website_url} (blocked/inaccessible)")
-                        website_failed = True
-                        # Don't mention the website is blocked - just use job title/industry info
-                        content_summaries = []
+                    if website_data is None:
+                        logging.info("🌐 [%s.%s] Scraping website: %s", batch_number, contact_index, website_url)
+                        website_data = self.web_scraper.scrape_website_content(website_url)
+                    website_pages = website_data.get('summaries', [])
                 except Exception as website_error:
-                    logging.warning(f"⚠️ Website scraping exception for {website_url}: {website_error}")
+                    logging.warning("⚠️ Website scraping exception for %s: %s", website_url, website_error)
+                if not website_pages:
+                    logging.warning("⚠️ Website scraping failed for %s (blocked/inaccessible)", website_url)
                     website_failed = True
-                    # Don't mention scraping failed - generate based on other data
-                    content_summaries = []
-            else:
-                logging.warning(f"No website URL for contact {contact.get('name')}")
+                    self._resolve_website_future(key, website_future, [])
+                    website_future = None
+        elif website_url and not content_summaries:
+            try:
+                content_summaries = self._get_website_summaries(website_url, website_data, batch_number, contact_index)
+                if not content_summaries:
+                    logging.warning("⚠️ Website scraping failed for %s (blocked/inaccessible)", website_url)
+                    website_failed = True
+                    # Don't mention the website is blocked - just use job title/industry info
+            except Exception as website_error:
+                logging.warning("⚠️ Website scraping exception for %s: %s", website_url, website_error)
                 website_failed = True
-                # No website, so generate based on name/title/company only
+                # Don't mention scraping failed - generate based on other data
                 content_summaries = []
-            
-            # Step 3: Prepare contact data for icebreaker generation (ALWAYS PROCEED)
-            contact_info = {
-                'first_name': contact.get('name', '').split(' ')[0] if contact.get('name') else '',
-                'last_name': contact.get('last_name', ''),
-                'headline': contact.get('title', '') or contact.get('headline', ''),
-                'location': f"{contact.get('city', '')} {contact.get('country', '')}".strip(),
-                'company_name': contact.get('company_name') or contact.get('organization', {}).get('name', '') if isinstance(contact.get('organization'), dict) else '',
-                'is_business_contact': contact.get('is_business_contact', False),
-                'website_summaries': content_summaries
-            }
-            
-            # Step 4: Generate icebreaker (ALWAYS ATTEMPT - even with limited data)
-            logging.info(f"🔄 STAGE 3: Generating icebreaker {contact_index} of {total_contacts} - Creating AI-powered icebreaker")
-            logging.info(f"💬 [{batch_number}.{contact_index}] Generating AI icebreaker for {contact.get('name')} {'(limited data)' if website_failed else ''}")
-            icebreaker_response = self.ai_processor.generate_icebreaker(contact_info, content_summaries)
-            
-            # ENHANCED: Never skip leads - always create a lead entry
-            if not icebreaker_response or not icebreaker_response.get('icebreaker'):
-                logging.warning(f"AI icebreaker failed for {contact.get('name')} - using fallback")
-                # Create a fallback icebreaker based on available contact info
-                fallback_icebreaker = self._create_fallback_icebreaker(contact_info)
-                fallback_subject = self._create_fallback_subject(contact_info)
-                icebreaker_response = {"icebreaker": fallback_icebreaker, "subject_line": fallback_subject}
-            
-            # Step 5: Prepare lead data
-            lead_data = {
-                'first_name': contact_info['first_name'],
-                'last_name': contact_info['last_name'],
-                'email': contact.get('email'),
-                'linkedin_url': contact.get('linkedin_url'),
-                'headline': contact_info['headline'],
-                'website_url': website_url,  # Fixed: was 'company_website'
-                'location': contact_info['location'],
-                'icebreaker': icebreaker_response['icebreaker'],
-                'subject_line': icebreaker_response.get('subject_line', ''),
-                'website_summaries': content_summaries
-            }
-            
-            # Step 6: Store processed lead in Supabase
-            logging.info(f"💾 [{batch_number}.{contact_index}] Storing lead in database for {contact.get('name')}")
-            processing_settings = {
-                'ai_model_summary': config.AI_MODEL_SUMMARY,
-                'ai_model_icebreaker': config.AI_MODEL_ICEBREAKER,
-                'ai_temperature': config.AI_TEMPERATURE,
-                'delay_between_ai_calls': config.DELAY_BETWEEN_AI_CALLS,
-                'min_confidence': 0.7
-            }
-            
-            created_lead = self.supabase_manager.create_processed_lead(
-                contact['id'],
-                contact['search_url_id'],
-                lead_data,
-                processing_settings
-            )
-            
-            if created_lead:
-                # Mark raw contact as processed
-                self.supabase_manager.mark_contact_processed(contact['id'])
-                logging.info(f"✅ [{batch_number}.{contact_index}] SUCCESS: Created lead for {lead_data['first_name']} {lead_data['last_name']}")
-                return True
-            else:
-                logging.error(f"❌ [{batch_number}.{contact_index}] FAILED: Could not create lead for {contact.get('name')}")
-                return False
-                
+        elif not content_summaries:
+            logging.warning("No website URL for contact %s", name)
+            website_failed = True
+            # No website, so generate based on name/title/company only
+
+        # Step 3: Prepare contact data for icebreaker generation (ALWAYS PROCEED)
+        fields = self._normalize_contact(contact)
+        contact_info = {
+            'first_name': fields['first_name'],
+            'last_name': fields['last_name'],
+            'headline': fields['headline'],
+            'location': fields['location'],
+            'company_name': fields['company_name'],
+            'is_business_contact': contact.get('is_business_contact', False),
+            'website_summaries': content_summaries,
+            'website_pages': website_pages
+        }
+
+        return {
+            'contact_info': contact_info,
+            'website_url': website_url,
+            'content_summaries': content_summaries,
+            'website_failed': website_failed,
+            # Fused mode: the domain summary this contact's icebreaker call must publish,
+            # or the one it has to wait for before its icebreaker is written
+            'website_future': website_future,
+            'pending_website': pending_website,
+        }
+
+    def _normalize_contact(self, contact: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Parse the contact fields used for icebreakers in one pass
+
+        Works for both raw_contacts rows (full 'name') and Apify contacts
+        ('first_name', 'organization.website_url').
+
+        Returns:
+            Dict with 'first_name', 'last_name', 'headline', 'location', 'company_name' and 'website_url'
+        """
+        organization = contact.get('organization')
+        if not isinstance(organization, dict):
+            organization = {}
+        return {
+            'first_name': contact.get('first_name') or (contact.get('name') or '').partition(' ')[0],
+            'last_name': contact.get('last_name') or '',
+            'headline': contact.get('title') or contact.get('headline') or '',
+            'location': f"{contact.get('city') or ''} {contact.get('country') or ''}".strip(),
+            'company_name': contact.get('company_name') or organization.get('name') or '',
+            'website_url': contact.get('website_url') or organization.get('website_url') or '',
+        }
+
+    def _uncached_website_urls(self, contacts: List[Dict[str, Any]]) -> List[str]:
+        """
+        Return one website URL per domain in the batch that still needs scraping
+
+        Domains already summarized in this run, or stored in the Supabase
+        website_summaries_cache table by an earlier run, are skipped.
+        """
+        urls_by_key = {}
+        for contact in contacts:
+            if not isinstance(contact, dict) or contact.get('website_summaries'):
+                continue
+            website_url = contact.get('website_url')
+            key = canonical_website_key(website_url)
+            if key and key not in self._website_cache:
+                urls_by_key.setdefault(key, website_url)
+
+        if urls_by_key and self.supabase_manager:
+            cached = self.supabase_manager.get_cached_website_summaries(list(urls_by_key))
+            with self._website_cache_lock:
+                for key, summaries in cached.items():
+                    if summaries and key not in self._website_cache:
+                        future = Future()
+                        future.set_result(summaries)
+                        self._website_cache[key] = future
+            if cached:
+                logging.info("♻️ Reusing cached summaries for %s websites", len(cached))
+
+        return [url for key, url in urls_by_key.items() if key not in self._website_cache]
+
+    def _cached_website_summaries(self, website_url: str) -> List[Dict[str, Any]]:
+        """Return the summaries already known for a website's domain (empty if none)"""
+        with self._website_cache_lock:
+            future = self._website_cache.get(canonical_website_key(website_url))
+        if future is None or not future.done():
+            return []
+        return self._future_summaries(future)
+
+    @staticmethod
+    def _future_summaries(future: Future) -> List[Dict[str, Any]]:
+        """Summaries held by a finished website cache entry (empty if its research failed)"""
+        if future.exception():
+            return []
+        return future.result()
+
+    def _resolve_website_future(self, key: str, future: Future, summaries: List[Dict[str, Any]]):
+        """
+        Publish a fused-mode domain summary to the contacts waiting on it
+
+        An empty result is only shared with the current waiters; the domain is dropped
+        from the cache so a later batch can try the site again.
+        """
+        if future.done():
+            return
+        if not summaries:
+            with self._website_cache_lock:
+                if self._website_cache.get(key) is future:
+                    del self._website_cache[key]
+        future.set_result(summaries)
+
+    def _remember_website_summaries(self, prepared: Dict[str, Any], icebreaker_response: Optional[Dict[str, Any]]):
+        """Keep the website summary produced by a fused icebreaker call for the lead and for later contacts"""
+        future = prepared.pop('website_future', None)
+        summaries = (icebreaker_response or {}).get('website_summaries') or []
+        if not prepared['contact_info'].get('website_pages'):
+            summaries = []
+        key = canonical_website_key(prepared['website_url'])
+
+        if summaries:
+            prepared['content_summaries'] = summaries
+            if self.supabase_manager:
+                self.supabase_manager.cache_website_summaries(key, prepared['website_url'], summaries)
+        if future is not None:
+            self._resolve_website_future(key, future, summaries)
+
+    def _apply_pending_website(self, prepared: Dict[str, Any]):
+        """Fill in the domain summary another contact's fused icebreaker call produced"""
+        future = prepared.pop('pending_website', None)
+        if future is None:
+            return
+        if not future.done():
+            # Its owner dropped out of the batch before writing an icebreaker
+            self._resolve_website_future(canonical_website_key(prepared['website_url']), future, [])
+        summaries = self._future_summaries(future)
+        prepared['content_summaries'] = summaries
+        prepared['contact_info']['website_summaries'] = summaries
+        prepared['website_failed'] = not summaries
+
+    def _get_website_summaries(self, website_url: str, website_data: Optional[Dict[str, Any]],
+                               batch_number: int, contact_index: int) -> List[Dict[str, Any]]:
+        """
+        Scrape and summarize a website once per domain, sharing the result across contacts
+
+        Returns:
+            AI summaries of the website's pages (empty if the site was blocked/inaccessible)
+        """
+        key = canonical_website_key(website_url)
+        with self._website_cache_lock:
+            future = self._website_cache.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._website_cache[key] = future
+
+        if not is_owner:
+            logging.info("♻️ [%s.%s] Reusing website summaries for %s", batch_number, contact_index, key)
+            return future.result()
+
+        try:
+            if website_data is None:
+                logging.info("🌐 [%s.%s] Scraping website: %s", batch_number, contact_index, website_url)
+                website_data = self.web_scraper.scrape_website_content(website_url)
+            page_summaries = website_data.get('summaries', [])
+
+            content_summaries = []
+            if page_summaries:
+                # Step 2: Generate AI summaries of website content
+                logging.info("🧠 [%s.%s] Generating AI summaries for website content", batch_number, contact_index)
+                content_summaries = self.ai_processor.summarize_website_pages(page_summaries)
+                if content_summaries and self.supabase_manager:
+                    self.supabase_manager.cache_website_summaries(key, website_url, content_summaries)
+
+            future.set_result(content_summaries)
+            return content_summaries
+
         except Exception as e:
-            error_msg = str(e).lower()
-            if "cloudflare" in error_msg or "403" in error_msg or "blocked" in error_msg:
-                logging.warning(f"⚠️ Website blocked/protected for {contact.get('name', 'Unknown')}: {e}")
+            future.set_exception(e)
+            raise
+
+    def _generate_icebreakers(self, batch_number: int, researched: List[Tuple[int, dict, Dict[str, Any]]],
+                              positions: List[int], icebreaker_responses: List[Optional[Dict[str, Any]]]):
+        """Fill in icebreaker_responses for the researched contacts at positions with one batched AI call"""
+        ai_positions = []
+        for k in positions:
+            prepared = researched[k][2]
+            if self._needs_ai_icebreaker(prepared):
+                ai_positions.append(k)
             else:
-                logging.error(f"❌ Processing error for {contact.get('name', 'Unknown')}: {e}")
-                logging.error(f"🔍 DEBUG: Exception type: {type(e)}")
-                logging.error(f"🔍 DEBUG: Contact data type: {type(contact)}")
+                icebreaker_responses[k] = self._fallback_icebreaker_response(prepared['contact_info'])
+
+        logging.info(f"💬 Batch {batch_number}: Generating {len(ai_positions)} AI icebreakers "
+                     f"({len(positions) - len(ai_positions)} template fallbacks)")
+        ai_responses = self.ai_processor.generate_icebreakers_batch(
+            [researched[k][2]['contact_info'] for k in ai_positions]
+        )
+        for k, response in zip(ai_positions, ai_responses):
+            icebreaker_responses[k] = response
+
+    def _needs_ai_icebreaker(self, prepared: Dict[str, Any]) -> bool:
+        """
+        Whether the AI has anything beyond name/location to work from
+
+        With no website content, headline or company the model can't beat the
+        fallback template, so the request (and its tokens) is skipped.
+        """
+        contact_info = prepared['contact_info']
+        return bool(
+            not prepared['website_failed']
+            or contact_info['headline']
+            or contact_info['company_name']
+        )
+
+    def _fallback_icebreaker_response(self, contact_info: Dict[str, Any]) -> Dict[str, str]:
+        """Template icebreaker and subject line built from the available contact info"""
+        return {
+            "icebreaker": self._create_fallback_icebreaker(contact_info),
+            "subject_line": self._create_fallback_subject(contact_info)
+        }
+
+    def _build_lead_data(self, contact: dict, prepared: Dict[str, Any], icebreaker_response: Optional[Dict[str, str]]) -> Dict[str, Any]:
+        """Combine a researched contact and its icebreaker into lead data"""
+        contact_info = prepared['contact_info']
+
+        # ENHANCED: Never skip leads - always create a lead entry
+        if not icebreaker_response or not icebreaker_response.get('icebreaker'):
+            logging.warning("AI icebreaker failed for %s - using fallback", contact.get('name'))
+            icebreaker_response = self._fallback_icebreaker_response(contact_info)
+
+        return {
+            'first_name': contact_info['first_name'],
+            'last_name': contact_info['last_name'],
+            'email': contact.get('email'),
+            'linkedin_url': contact.get('linkedin_url'),
+            'headline': contact_info['headline'],
+            'website_url': prepared['website_url'],  # Fixed: was 'company_website'
+            'location': contact_info['location'],
+            'icebreaker': icebreaker_response['icebreaker'],
+            'subject_line': icebreaker_response.get('subject_line', ''),
+            'website_summaries': prepared['content_summaries']
+        }
+
+    def _processing_settings(self) -> Dict[str, Any]:
+        """Settings recorded alongside every processed lead"""
+        return {
+            'ai_model_summary': config.AI_MODEL_SUMMARY,
+            'ai_model_icebreaker': config.AI_MODEL_ICEBREAKER,
+            'ai_temperature': config.AI_TEMPERATURE,
+            # No longer a fixed sleep (OpenAI calls are paced by rate limit headers), but
+            # still recorded so readers of processing_settings_used keep the key
+            'delay_between_ai_calls': config.DELAY_BETWEEN_AI_CALLS,
+            'min_confidence': 0.7
+        }
+
+    def _log_contact_error(self, contact: Any, e: Exception):
+        """Log a per-contact processing failure"""
+        if not logging.getLogger().isEnabledFor(logging.ERROR):
+            return
+        if _BLOCKED_RE.search(str(e)):
+            logging.warning("⚠️ Website blocked/protected for %s: %s", contact.get('name', 'Unknown'), e)
+        else:
+            logging.error("❌ Processing error for %s: %s", contact.get('name', 'Unknown'), e)
+            error_number = next(self._contact_error_counter)
+            # Only build the debug dump (keys, traceback) when DEBUG logging is on,
+            # otherwise keep a sampled traceback so noisy runs don't format one per contact
+            if logging.getLogger().isEnabledFor(logging.DEBUG):
+                logging.debug("🔍 DEBUG: Exception type: %s", type(e))
+                logging.debug("🔍 DEBUG: Contact data type: %s", type(contact))
                 if hasattr(contact, 'keys'):
-                    logging.error(f"🔍 DEBUG: Contact keys: {list(contact.keys())}")
+                    logging.debug("🔍 DEBUG: Contact keys: %s", list(contact.keys()))
                 else:
-                    logging.error(f"🔍 DEBUG: Contact content: {contact}")
-                import traceback
-                logging.error(f"🔍 DEBUG: Full traceback: {traceback.format_exc()}")
-            return False
-    
+                    logging.debug("🔍 DEBUG: Contact content: %s", contact)
+                logging.debug("🔍 DEBUG: Full traceback: %s", traceback.format_exc())
+            elif error_number % _TRACEBACK_SAMPLE_EVERY == 0:
+                logging.error("🔍 Sampled traceback (error #%s): %s", error_number + 1, traceback.format_exc())
+
     def _create_fallback_icebreaker(self, contact_info: Dict[str, Any]) -> str:
         """
         Create a fallback icebreaker when AI generation fails or website data is unavailable
@@ -672,15 +966,9 @@ class LeadGenerationOrchestrator:
         headline = contact_info.get('headline', '')
         location = contact_info.get('location', '')
         
-        # Create different fallback templates based on available data
-        if headline and location:
-            return f"Hi {first_name},\n\nSaw your profile as {headline} in {location}. Working on something in your space that might be relevant.\n\nWould love to connect and share what we're building."
-        elif headline:
-            return f"Hi {first_name},\n\nNoticed your work as {headline}. We're building something that aligns with your expertise.\n\nInterested in a quick chat about potential synergies?"
-        elif location:
-            return f"Hi {first_name},\n\nConnecting with professionals in {location}. Working on something that might interest your network.\n\nOpen to a brief conversation?"
-        else:
-            return f"Hi {first_name},\n\nCame across your profile and thought there might be some interesting overlap with what we're working on.\n\nWould you be open to a brief conversation?"
+        # Pick the template matching the available data
+        template = _FALLBACK_TEMPLATES[(bool(headline), bool(location))]
+        return template.format(first_name=first_name, headline=headline, location=location)
     
     def _create_fallback_subject(self, contact_info: Dict[str, Any]) -> str:
         """
@@ -692,25 +980,12 @@ class LeadGenerationOrchestrator:
         Returns:
             str: Short, engaging subject line
         """
-        import random
         first_name = contact_info.get('first_name', 'there')
         company = contact_info.get('company_name', contact_info.get('company', ''))
         
         if company and len(company) > 3:
-            short_company = company[:20] if len(company) > 20 else company
-            return random.choice([
-                f"Quick question about {short_company}",
-                f"{first_name}, about {short_company[:15]}",
-                f"Idea for {short_company}",
-                f"{short_company} opportunity",
-            ])
-        else:
-            return random.choice([
-                f"Quick question, {first_name}",
-                f"{first_name}, 30 seconds?",
-                f"Idea for you, {first_name}",
-                f"Relevant for you, {first_name}",
-            ])
+            return random.choice(_company_subject_pool(company, first_name))
+        return random.choice(_SUBJ_NAME_TEMPLATES).format(first_name=first_name)
     
     def _run_legacy_workflow(self) -> bool:
         """Legacy workflow for Google Sheets compatibility"""
@@ -734,62 +1009,130 @@ class LeadGenerationOrchestrator:
         """
         processed_contacts = []
         
-        for contact in contacts[:config.BATCH_SIZE]:  # Limit batch size
-            try:
-                logging.info(f"🔬 Processing contact: {contact.get('first_name', '')} {contact.get('last_name', '')}")
-                
-                # Step 1: Extract website URL
-                website_url = contact.get('organization', {}).get('website_url', '')
-                if not website_url:
-                    logging.warning(f"No website URL for contact {contact.get('first_name', '')}")
-                    continue
-                
-                # Step 2: Research website
-                website_data = self.web_scraper.scrape_website_content(website_url)
-                page_summaries = website_data.get('summaries', [])
-                
-                if not page_summaries:
-                    logging.warning(f"No website content found for {website_url}")
-                    continue
-                
-                # Step 3: Generate AI summaries
-                content_summaries = self.ai_processor.summarize_website_pages(page_summaries)
-                
-                # Step 4: Generate icebreaker
-                contact_with_summaries = contact.copy()
-                contact_with_summaries['website_summaries'] = content_summaries
-                
-                # Add location field (combining city and country)
-                contact_with_summaries['location'] = f"{contact.get('city', '')} {contact.get('country', '')}".strip()
-                
-                icebreaker_result = self.ai_processor.generate_icebreaker(
-                    contact_with_summaries, 
-                    content_summaries
-                )
-                
-                # Step 5: Prepare final contact data
-                final_contact = {
-                    'first_name': contact.get('first_name', ''),
-                    'last_name': contact.get('last_name', ''),
-                    'email': contact.get('email', ''),
-                    'website_url': website_url,
-                    'phone_number': '',  # Not available from this Apify scraper
-                    'location': contact_with_summaries['location'],
-                    'mutiline_icebreaker': icebreaker_result.get('icebreaker', ''),
-                    'subject_line': icebreaker_result.get('subject_line', '')
+        contacts = contacts[:config.BATCH_SIZE]  # Limit batch size
+        normalized_contacts = [self._normalize_contact(contact) for contact in contacts]
+        
+        # A contact without an email or first name can't become a lead, so drop it
+        # before any website research or AI call is spent on it
+        usable_contacts = [
+            (contact, fields) for contact, fields in zip(contacts, normalized_contacts)
+            if contact.get('email') and fields['first_name']
+        ]
+        if len(usable_contacts) < len(contacts):
+            logging.info("⏭️ Skipping %s contacts without an email or first name", len(contacts) - len(usable_contacts))
+        
+        # Research each company website once per run (contacts of the same organization
+        # share it, across batches too), scraping the sites not yet summarized concurrently
+        site_urls = self._uncached_website_urls([fields for _, fields in usable_contacts])
+        site_pages = self.web_scraper.scrape_websites(site_urls)
+        if site_urls:
+            with ThreadPoolExecutor(max_workers=min(config.MAX_CONTACTS_PARALLEL, len(site_urls))) as executor:
+                future_to_url = {
+                    executor.submit(self._get_website_summaries, website_url, site_pages.get(website_url, {}), 0, 0): website_url
+                    for website_url in site_urls
                 }
-                
-                processed_contacts.append(final_contact)
-                logging.info(f"✅ Successfully processed {contact.get('first_name', '')} {contact.get('last_name', '')}")
-                
-            except Exception as e:
-                logging.error(f"❌ Failed to process contact {contact.get('first_name', '')}: {e}")
+                # A failed site only leaves its own contacts without research
+                for future in as_completed(future_to_url):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        logging.error("❌ Error researching website %s: %s", future_to_url[future], e)
+        
+        # First pass: collect every contact that has website research to write from
+        ready = []
+        for contact, fields in usable_contacts:
+            logging.info("🔬 Processing contact: %s %s", fields['first_name'], fields['last_name'])
+            
+            # Step 1: Extract website URL
+            website_url = fields['website_url']
+            if not website_url:
+                logging.warning("No website URL for contact %s", fields['first_name'])
+                continue
+            
+            # Steps 2-3: Look up the website research done for the batch
+            content_summaries = self._cached_website_summaries(website_url)
+            if not content_summaries:
+                logging.warning("No website content found for %s", website_url)
+                continue
+            
+            contact_with_summaries = contact.copy()
+            contact_with_summaries['website_summaries'] = content_summaries
+            contact_with_summaries['location'] = fields['location']
+            ready.append((contact, fields, contact_with_summaries))
+        
+        # Step 4: Generate the icebreakers concurrently
+        icebreaker_results = self.ai_processor.generate_icebreakers_batch(
+            [contact_with_summaries for _, _, contact_with_summaries in ready]
+        )
+        
+        # Second pass: prepare final contact data
+        for (contact, fields, contact_with_summaries), icebreaker_result in zip(ready, icebreaker_results):
+            if not icebreaker_result:
+                logging.error("❌ Failed to process contact %s: no icebreaker generated", fields['first_name'])
                 continue
+            
+            final_contact = {
+                'first_name': fields['first_name'],
+                'last_name': fields['last_name'],
+                'email': contact.get('email', ''),
+                'website_url': fields['website_url'],
+                'phone_number': '',  # Not available from this Apify scraper
+                'location': fields['location'],
+                'mutiline_icebreaker': icebreaker_result.get('icebreaker', ''),
+                'subject_line': icebreaker_result.get('subject_line', '')
+            }
+            
+            processed_contacts.append(final_contact)
+            logging.info("✅ Successfully processed %s %s", fields['first_name'], fields['last_name'])
         
         return processed_contacts
     
-    def test_connections(self) -> bool:
-        """Test all API connections"""
+    def close(self):
+        """Release pooled HTTP connections and worker threads"""
+        self.web_scraper.close()
+        self.local_scraper.close()
+        self.apify_scraper.close()
+        self.ai_processor.close()
+
+    def _healthcheck_cache_key(self) -> str:
+        """Fingerprint of the credentials (and services) the connection tests cover"""
+        parts = [config.APIFY_API_KEY, config.OPENAI_API_KEY, config.AI_BASE_URL]
+        if self.use_supabase and self.supabase_manager:
+            parts += [self.supabase_manager.supabase_url, self.supabase_manager.supabase_key]
+        return hashlib.sha256("\0".join(str(part or '') for part in parts).encode()).hexdigest()
+
+    def _healthcheck_cached(self, cache_key: str) -> bool:
+        """Whether the same credentials passed the connection tests within HEALTHCHECK_CACHE_TTL"""
+        try:
+            with open(config.HEALTHCHECK_CACHE_FILE, 'r') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return False
+        return (
+            cached.get('key') == cache_key
+            and time.time() - cached.get('passed_at', 0) < config.HEALTHCHECK_CACHE_TTL
+        )
+
+    def _store_healthcheck(self, cache_key: str):
+        """Remember a passed connection test so the next invocations can skip the probes"""
+        try:
+            with open(config.HEALTHCHECK_CACHE_FILE, 'w') as f:
+                json.dump({'key': cache_key, 'passed_at': time.time()}, f)
+        except OSError as e:
+            logging.debug("Could not write health check cache: %s", e)
+
+    def test_connections(self, force: bool = False) -> bool:
+        """
+        Test all API connections
+
+        A pass is cached on disk for HEALTHCHECK_CACHE_TTL seconds (per set of
+        credentials); failures are never cached. Set force to probe anyway.
+        """
+        cache_key = self._healthcheck_cache_key()
+        if not force and self._healthcheck_cached(cache_key):
+            logging.info("⚡ Using cached health check")
+            return True
+
         logging.info("🧪 Testing API connections...")
         
         tests = [
@@ -802,18 +1145,24 @@ class LeadGenerationOrchestrator:
         if self.use_supabase and self.supabase_manager:
             tests.append(("Supabase Database", self.supabase_manager.test_connection))
         
+        # Run the probes concurrently so startup waits only for the slowest one
         all_passed = True
-        for test_name, test_func in tests:
-            try:
-                if test_func():
-                    logging.info(f"✅ {test_name} connection successful")
-                else:
-                    logging.error(f"❌ {test_name} connection failed")
+        with ThreadPoolExecutor(max_workers=len(tests)) as executor:
+            future_to_name = {executor.submit(test_func): test_name for test_name, test_func in tests}
+            for future in as_completed(future_to_name):
+                test_name = future_to_name[future]
+                try:
+                    if future.result():
+                        logging.info(f"✅ {test_name} connection successful")
+                    else:
+                        logging.error(f"❌ {test_name} connection failed")
+                        all_passed = False
+                except Exception as e:
+                    logging.error(f"❌ {test_name} connection error: {e}")
                     all_passed = False
-            except Exception as e:
-                logging.error(f"❌ {test_name} connection error: {e}")
-                all_passed = False
         
+        if all_passed:
+            self._store_healthcheck(cache_key)
         return all_passed
     
     def run_single_contact_test(self, search_url: str) -> bool:
@@ -851,17 +1200,14 @@ class LeadGenerationOrchestrator:
             search_url_id = search_data['id']
             logging.info(f"🔍 DEBUG TEST: Created search_url_id={search_url_id} for test")
             
-            # Stage 1: Scrape and store raw contacts (same as production)
-            raw_contacts = self.apify_scraper.scrape_contacts(search_url, total_records=record_count)
+            # Stage 1: Scrape and store raw contacts page by page as they arrive (same as production)
+            contact_pages = self.apify_scraper.iter_contact_pages(search_url, total_records=record_count)
+            scraped_count, stored_count = self._store_raw_contact_pages(contact_pages, search_url_id)
             
-            if not raw_contacts:
+            if not scraped_count:
                 logging.error("❌ CRITICAL: No contacts found in test")
                 return False
                 
-            # Stage 2: Store ALL raw contact data in Supabase first
-            logging.info(f"💾 TEST MODE: Storing {len(raw_contacts)} raw contacts in database")
-            stored_count = self.supabase_manager.batch_insert_raw_contacts(raw_contacts, search_url_id)
-            
             if stored_count == 0:
                 logging.error("❌ CRITICAL: Failed to store raw contacts in test mode")
                 return False
@@ -878,71 +1224,89 @@ class LeadGenerationOrchestrator:
             logging.error(f"Single contact test error: {e}")
             return False
 
+def _missing_api_keys() -> List[str]:
+    """Names of the API keys the orchestrator can't run without"""
+    config.reload_config()
+    missing = []
+    if not config.OPENAI_API_KEY and not config.AI_BASE_URL:
+        missing.append('OPENAI_API_KEY')
+    if not config.APIFY_API_KEY or config.APIFY_API_KEY == 'your_apify_api_key_here':
+        missing.append('APIFY_API_KEY')
+    return missing
+
 def main():
     """Main entry point"""
+    # Without these keys no mode can work, so stop before building any clients
+    missing_keys = _missing_api_keys()
+    if missing_keys:
+        logging.error(f"❌ Missing required API keys: {', '.join(missing_keys)}")
+        return
+    
     try:
         # Get organization context from environment (set by server)
         organization_id = os.getenv('CURRENT_ORGANIZATION_ID')
         
-        # Try Supabase first (new default) with organization context
+        # Supabase with organization context (the orchestrator falls back to
+        # legacy mode by itself if Supabase can't be initialized)
         orchestrator = LeadGenerationOrchestrator(
             use_supabase=True, 
             use_sheets=False, 
             organization_id=organization_id
         )
     except Exception as e:
-        logging.error(f"Failed to initialize orchestrator with Supabase: {e}")
-        # Fallback to legacy mode without any database
-        logging.info("Trying to initialize in legacy test mode...")
-        try:
-            orchestrator = LeadGenerationOrchestrator(use_supabase=False, use_sheets=False)
-        except Exception as e2:
-            logging.error(f"Failed to initialize orchestrator: {e2}")
-            return
-    
-    # Test connections first
-    if not orchestrator.test_connections():
-        logging.error("❌ Connection tests failed. Please check your API keys.")
+        logging.error(f"Failed to initialize orchestrator: {e}")
         return
     
-    # Check command line arguments
-    if len(sys.argv) > 1:
-        if sys.argv[1] == "test":
-            # Run single contact test
-            # Check if a test URL was provided via environment or use a default
-            test_url = os.getenv('TEST_APOLLO_URL', '')
-            if not test_url:
-                # For UI-based testing, we'll use a default Apollo URL
-                test_url = "https://app.apollo.io/#/people?page=1&organizationLocations[]=United%20States&organizationNumEmployeesRanges[]=1%2C10&organizationNumEmployeesRanges[]=51%2C100&organizationNumEmployeesRanges[]=11%2C20&organizationNumEmployeesRanges[]=21%2C50&organizationIndustryTagIds[]=5567cd4773696439b10b0000&organizationIndustryTagIds[]=5567cd4e7369643b70010000&sortByField=%5Bnone%5D&sortAscending=false&personTitles[]=manager&personTitles[]=ceo&personTitles[]=cmo"
-                logging.info(f"Using default Apollo test URL: {test_url[:100]}...")
+    # --force-healthcheck re-runs the connection tests even if a recent pass is cached
+    force_healthcheck = "--force-healthcheck" in sys.argv
+    args = [arg for arg in sys.argv[1:] if arg != "--force-healthcheck"]
+    
+    try:
+        # Test connections first
+        if not orchestrator.test_connections(force=force_healthcheck):
+            logging.error("❌ Connection tests failed. Please check your API keys.")
+            return
+    
+        # Check command line arguments
+        if args:
+            if args[0] == "test":
+                # Run single contact test
+                # Check if a test URL was provided via environment or use a default
+                test_url = os.getenv('TEST_APOLLO_URL', '')
+                if not test_url:
+                    # For UI-based testing, we'll use a default Apollo URL
+                    test_url = _DEFAULT_APOLLO_TEST_URL
+                    logging.info(f"Using default Apollo test URL: {test_url[:100]}...")
+            
+                orchestrator.run_single_contact_test(test_url)
+            elif args[0] == "once":
+                # Run workflow once
+                if orchestrator.use_supabase or orchestrator.use_sheets:
+                    orchestrator.run_workflow()
+                else:
+                    logging.error("Cannot run full workflow without database. Use 'test' mode instead.")
+            elif args[0] == "campaign":
+                # Run campaign workflow
+                campaign_id = os.getenv('CAMPAIGN_ID')
+                if not campaign_id:
+                    logging.error("Campaign ID not provided. Set CAMPAIGN_ID environment variable.")
+                    return
             
-            orchestrator.run_single_contact_test(test_url)
-        elif sys.argv[1] == "once":
-            # Run workflow once
+                if orchestrator.use_supabase:
+                    logging.info(f"🎯 Starting campaign execution for: {campaign_id}")
+                    orchestrator.run_workflow(campaign_id=campaign_id)
+                else:
+                    logging.error("Campaign mode requires Supabase to be enabled.")
+            else:
+                print("Usage: python main.py [test|once|campaign] [--force-healthcheck]")
+        else:
+            # Default: run workflow once
             if orchestrator.use_supabase or orchestrator.use_sheets:
                 orchestrator.run_workflow()
             else:
                 logging.error("Cannot run full workflow without database. Use 'test' mode instead.")
-        elif sys.argv[1] == "campaign":
-            # Run campaign workflow
-            campaign_id = os.getenv('CAMPAIGN_ID')
-            if not campaign_id:
-                logging.error("Campaign ID not provided. Set CAMPAIGN_ID environment variable.")
-                return
-            
-            if orchestrator.use_supabase:
-                logging.info(f"🎯 Starting campaign execution for: {campaign_id}")
-                orchestrator.run_workflow(campaign_id=campaign_id)
-            else:
-                logging.error("Campaign mode requires Supabase to be enabled.")
-        else:
-            print("Usage: python main.py [test|once|campaign]")
-    else:
-        # Default: run workflow once
-        if orchestrator.use_supabase or orchestrator.use_sheets:
-            orchestrator.run_workflow()
-        else:
-            logging.error("Cannot run full workflow without database. Use 'test' mode instead.")
+    finally:
+        orchestrator.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,13 @@
+-- Website Summaries Cache Migration
+-- Stores AI summaries per website domain so re-runs skip both the scrape and the summarization
+
+CREATE TABLE IF NOT EXISTS public.website_summaries_cache (
+    domain TEXT PRIMARY KEY, -- Canonical domain (lowercase, no www.)
+    website_url TEXT, -- URL the summaries were generated from
+    summaries JSONB NOT NULL DEFAULT '[]'::jsonb,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_website_summaries_cache_updated_at
+    ON public.website_summaries_cache(updated_at);
@@ -1,10 +1,242 @@
+import json
 import logging
+import random
+import re
 import time
 import hashlib
+import threading
+from collections import OrderedDict
 from enum import Enum
 from typing import List, Dict, Any, Optional
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from openai import OpenAI
+import httpx
+
+try:
+    import h2  # noqa: F401 - lets httpx speak HTTP/2
+except ImportError:
+    h2 = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Decoder for the model's JSON replies (orjson is several times faster; both raise
+# a json.JSONDecodeError subclass on bad input)
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+
+# Completion tokens assumed for the TPM budget when a request sets no max_tokens
+_DEFAULT_COMPLETION_TOKENS = 500
+
+# Subject line patterns the icebreaker prompt forbids: (how the rulebook words it, regex checked
+# on the model's output). Both the prompt and _FORBIDDEN_SUBJECT_RE are built from this list
+_FORBIDDEN_SUBJECT_PATTERNS = (
+    ('"Inquiry for [X]" or "Inquiry about [X]"', r"\binquiry (?:for|about)\b"),
+    ('"Quick question about [X]"', r"\bquick question about\b"),
+    ('"Question about [X]"', r"^\s*question about\b"),
+    ('"Re: [X]" or "Fwd: [X]"', r"^\s*(?:re|fwd?)\s*:"),
+    ('"Regarding [X]"', r"^\s*regarding\b"),
+    ('"[Company]\'s [thing]"', r"^\s*\S+'s\s+\S+\s*$"),
+    ('Any variation of "quick question"', r"\bquick\s+q(?:uestion)?\b"),
+    ('Generic greetings like "Hello" or "Hi there"', r"^\s*(?:hello|hi there)\b"),
+)
+
+# Checked once more on the model's output
+_FORBIDDEN_SUBJECT_RE = re.compile(
+    "|".join(f"(?:{pattern})" for _, pattern in _FORBIDDEN_SUBJECT_PATTERNS),
+    re.IGNORECASE
+)
+
+
+# {{variable}} placeholders in organization-specific icebreaker prompts
+_TEMPLATE_VARIABLE_RE = re.compile(r"\{\{(\w+)\}\}")
+
+
+def _fill_template_variables(prompt: str, values: Dict[str, str]) -> str:
+    """Replace every {{name}} placeholder in one pass (unknown names are left as they are)"""
+    return _TEMPLATE_VARIABLE_RE.sub(lambda match: values.get(match.group(1), match.group(0)), prompt)
+
+
+# Mailbox names of shared business inboxes (info@, sales@, ...) that get the B2B icebreaker
+_GENERIC_EMAIL_LOCAL_PARTS = frozenset({'info', 'contact', 'hello', 'sales', 'support', 'admin', 'office'})
+
+# Per-contact style choices for generate_icebreaker (sent in the final user message)
+_OPENING_STYLES = (
+    "STYLE: Start with a question about their business.",
+    "STYLE: Lead with an observation about their industry.",
+    "STYLE: Open with their name and a direct statement.",
+    "STYLE: Begin with an insight about their market.",
+    "STYLE: Start with what caught your attention.",
+)
+
+_CONNECTION_STYLES = (
+    "Make the connection to our solution subtle and natural.",
+    "Be direct about how we can help.",
+    "Focus on their pain point first, then our solution.",
+    "Highlight a specific opportunity we can address.",
+    "Connect through a shared challenge in their industry.",
+)
+
+_SUBJECT_LINE_STYLES = (
+    "curiosity-gap", "value-driven", "specific-observation",
+    "pattern-interrupt", "direct-benefit", "social-proof",
+    "location-specific", "industry-insight", "unexpected-angle",
+)
+
+def _icebreaker_schema_format(fields: tuple) -> Dict[str, Any]:
+    """Strict json_schema response format for an icebreaker reply with the given string fields"""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "icebreaker",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {field: {"type": "string"} for field in fields},
+                "required": list(fields),
+                "additionalProperties": False,
+            },
+        },
+    }
+
+
+# Strict schemas for icebreaker replies, on models that support structured outputs
+_ICEBREAKER_RESPONSE_FORMAT = _icebreaker_schema_format(("icebreaker", "subject_line"))
+_ICEBREAKER_WITH_SUMMARY_RESPONSE_FORMAT = _icebreaker_schema_format(("icebreaker", "subject_line", "website_summary"))
+
+# Models that accept json_schema response formats (gpt-4o-2024-05-13 and older models do not)
+_STRUCTURED_OUTPUT_MODELS = frozenset({
+    "gpt-4o", "gpt-4o-2024-08-06", "gpt-4o-2024-11-20",
+    "gpt-4o-mini", "gpt-4o-mini-2024-07-18",
+    "gpt-4.1", "gpt-4.1-2025-04-14",
+    "gpt-4.1-mini", "gpt-4.1-mini-2025-04-14",
+    "gpt-4.1-nano", "gpt-4.1-nano-2025-04-14",
+    "gpt-5", "gpt-5-mini", "gpt-5-nano",
+})
+
+# Few-shot assistant reply shown before every personalized icebreaker request (kept short:
+# it is sent as input tokens on every call)
+_ICEBREAKER_EXAMPLE = (
+    '{"icebreaker":"Hey Aina,\\n\\nLove the white-label angle on Maki\'s site. I built an outreach system '
+    'that pitches agencies with ready-made demo sites for a few cents each - feels like a fit for how you scale. '
+    'Worth a look?","subject_line":"White-label demos for Maki"}'
+)
+
+# Subject lines for the B2B fallback email, called with (business name, category, city);
+# only the chosen one gets formatted
+_B2B_FALLBACK_SUBJECTS = (
+    lambda business, category, city: f"{business[:20]} → more customers",
+    lambda business, category, city: f"{city} {category[:15]}" if city and category else f"{category[:20]} tip",
+    lambda business, category, city: f"{business[:15]} opportunity",
+    lambda business, category, city: f"{category[:20]} automation FYI" if category else f"{business[:20]} idea",
+    lambda business, category, city: f"Idea for {business[:18]}",
+)
+
+# Static subject line rulebook appended to the icebreaker prompt (built once, not per call)
+_SUBJECT_LINE_RULES = """
+
+CRITICAL: CREATE A UNIQUE, HIGH-CONVERTING EMAIL SUBJECT LINE
+
+MANDATORY REQUIREMENTS:
+1. Length: 25-45 characters (mobile-optimized)
+2. Style for this email: the SUBJECT LINE STYLE given with the profile
+3. MUST be UNIQUE - NO GENERIC PATTERNS ALLOWED
+4. Use SPECIFIC details from the business (location, category, rating, name)
+
+❌ ABSOLUTELY FORBIDDEN PATTERNS (do NOT use these):
+""" + "\n".join(f"- {description}" for description, _ in _FORBIDDEN_SUBJECT_PATTERNS) + """
+
+✅ REQUIRED PERSONALIZATION - Pick ONE approach and execute it PERFECTLY:
+
+1. LOCATION-SPECIFIC (if location available):
+   - "[City] [category] owners listen up"
+   - "Your [category] spot in [City]"
+   - "[Neighborhood] [business type] idea"
+   Example: "Brooklyn cafe owners listen up"
+
+2. RATING/REPUTATION (if rating >= 4.0):
+   - "Your [rating]★ secret?"
+   - "[X] stars - here's how to 5"
+   - "Top-rated [category] in [city]"
+   Example: "Your 4.8★ secret?"
+
+3. CATEGORY-SPECIFIC INSIGHT:
+   - "[Category] revenue trick"
+   - "Most [category]s miss this"
+   - "[Category] automation FYI"
+   Example: "Restaurant revenue trick"
+
+4. PATTERN INTERRUPT:
+   - "[Business name] → more [desired outcome]"
+   - "A [category] idea for [Business]"
+   - "[Business] question from [your name]"
+   Example: "Joe's Coffee → more walk-ins"
+
+5. SOCIAL PROOF:
+   - "17 [category]s use this"
+   - "[City] [category]s switching to..."
+   - "Your competitor just did this"
+   Example: "17 dentists use this"
+
+6. VALUE-SPECIFIC:
+   - "3x more [outcome] for [category]"
+   - "[Category] bookings system"
+   - "Save [X] hours weekly"
+   Example: "3x more orders for restaurants"
+
+7. CURIOSITY WITH SPECIFICITY:
+   - "What [X] [category]s know"
+   - "[Business] missing out?"
+   - "This helps busy [category] owners"
+   Example: "What top cafes know"
+
+8. UNEXPECTED ANGLE:
+   - "Your [category] website issue"
+   - "[Business] Google visibility"
+   - "Noticed [Business]'s [specific thing]"
+   Example: "Your restaurant's Google ranking"
+
+COMPOSITION RULES:
+- Use numbers when possible (3x, 17, 5 stars)
+- Reference their specific business name OR category (not both)
+- If they have location, use it creatively
+- If they have high rating, reference it
+- Be conversational, not corporate
+- Create curiosity WITHOUT clickbait
+- Test would YOU open this email?
+
+EXAMPLES OF HIGH-CONVERTING SUBJECT LINES:
+- "Brooklyn pizza spot opportunity" (location + category)
+- "Your 4.9★ reviews → more sales" (rating + benefit)
+- "Dental practice automation FYI" (category + value)
+- "23 NYC cafes switched" (social proof + location)
+- "Joe's Diner visibility issue" (name + specific problem)
+- "Austin restaurant owners" (location + category)
+- "Your competitor just did this" (competitive angle)
+- "Bakery order system upgrade" (category + specific)
+
+QUALITY CHECK - Your subject line MUST:
+✓ Be 25-45 characters
+✓ Use at LEAST ONE specific detail (name/location/category/rating)
+✓ NOT use any forbidden patterns
+✓ Create genuine curiosity
+✓ Sound natural when read aloud
+✓ Be different from "inquiry" or "question" patterns
+
+Return your response in this EXACT JSON format:
+{
+  "icebreaker": "your personalized icebreaker message",
+  "subject_line": "your unique, high-converting subject line (25-45 chars)"
+}"""
+
+# Appended when generate_icebreaker also summarizes raw website pages
+_WEBSITE_SUMMARY_INSTRUCTIONS = """
+
+The Website section contains the raw content of their website pages, not summaries.
+Also add a "website_summary" field to the same JSON object: a two-paragraph abstract of what
+the business does, in a straightforward, spartan tone (or "no content" if it's empty)."""
 
 
 class IcebreakerVariant(Enum):
@@ -15,10 +247,131 @@ class IcebreakerVariant(Enum):
 
 from config import (
     OPENAI_API_KEY, AI_MODEL_SUMMARY, AI_MODEL_ICEBREAKER,
-    AI_TEMPERATURE, DELAY_BETWEEN_AI_CALLS, SUMMARY_PROMPT,
-    ICEBREAKER_PROMPT, reload_config, MAX_AI_WORKERS
+    AI_TEMPERATURE, SUMMARY_PROMPT,
+    ICEBREAKER_PROMPT, reload_config, MAX_AI_WORKERS, AI_BASE_URL
 )
-from .rate_limiter import rate_limiter
+from .rate_limiter import rate_limiter, retry_after_seconds
+
+# Placeholder WebScraper returns for pages without usable content
+_EMPTY_PAGE = '<div>empty</div>'
+
+
+def _is_empty_page(content: str) -> bool:
+    """Whether scraped page content is missing or the empty placeholder (only short strings are stripped)"""
+    return not content or (len(content) < 64 and content.strip() == _EMPTY_PAGE)
+
+
+_http_client = None
+_http_client_lock = threading.Lock()
+
+
+def _shared_http_client() -> httpx.Client:
+    """
+    One pooled HTTP client for every AIProcessor in the process
+
+    With h2 installed, concurrent requests multiplex over one HTTP/2 connection
+    instead of each worker holding its own HTTP/1.1 connection.
+    """
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None or _http_client.is_closed:
+            _http_client = httpx.Client(
+                http2=h2 is not None,
+                timeout=httpx.Timeout(600.0, connect=5.0),  # OpenAI SDK defaults
+                limits=httpx.Limits(max_connections=MAX_AI_WORKERS * 2, max_keepalive_connections=MAX_AI_WORKERS)
+            )
+        return _http_client
+
+
+# Contact-independent part of the B2B prompt. It comes before the per-business
+# details so every B2B request shares the same prefix for OpenAI prompt caching
+_B2B_WRITING_RULES = """Write a cold email that sounds like a real person wrote it. Goal: Get a reply.
+
+============================================
+WRITING RULES (critical for conversions)
+============================================
+
+**TONE:** Write like you're texting a business owner you respect but haven't met.
+- Short sentences. Casual punctuation.
+- No corporate speak. No buzzwords.
+- Sound like a person, not a company.
+
+**LENGTH:** 3-4 sentences MAX. Under 60 words total.
+- Busy people delete long emails without reading
+- If you can cut a word, cut it
+
+**STRUCTURE:**
+- Line 1: Hook them with something specific to THEM
+- Line 2: Connect it to what you do (briefly)
+- Line 3: Simple question CTA (under 6 words)
+
+**ABSOLUTELY FORBIDDEN (instant spam folder):**
+- "Quick question" - spam trigger
+- "Hope this finds you well" - AI tell
+- "reaching out" or "wanted to connect" - salesy
+- "crushing it" - fake flattery
+- Starting with "I noticed" or "I saw" - overused
+- "businesses like yours" - too vague
+- Anything over 4 sentences
+- Using "Dr. [Name]" unless you have their ACTUAL name (not from business name)
+- Promising to send materials, data, catalogs, or samples
+
+**CTA RULES (CRITICAL - research shows this matters most):**
+- ONE question only, under 6 words
+- Must be a question (ends with ?)
+- Low commitment: "Worth a look?" "Curious?" "Interested?"
+- DO NOT offer to send anything specific
+- DO NOT mention calls, demos, or meetings in first email
+
+**OPENER VARIETY (CRITICAL - pick ONE, DO NOT always use reviews):**
+
+IMPORTANT: Vary your opening style. If using reviews/ratings, limit to 30% of the time.
+
+Style A - Question Hook (best for engagement):
+"Do your patients ask for something to use between visits?"
+"Ever wonder why [competitor] gets more walk-ins?"
+
+Style B - Local Trend (builds credibility):
+"A few [city] [category]s started [doing X] this year..."
+"Noticed a trend among [city] [category]s lately..."
+
+Style C - Problem Lead (shows understanding):
+"One thing [category]s tell me: [specific pain point]..."
+"The biggest challenge I hear from [category] owners..."
+
+Style D - Website/Research Insight (when you have content):
+"Saw on your site that you [specific thing]..."
+"Your [specific service/page] caught my eye..."
+
+Style E - Direct Value (for perfect fits):
+"[Product] helps [category]s [specific outcome]..."
+"Quick way for [category]s to [benefit]..."
+
+Style F - Social Proof (sparingly):
+"[X] reviews at [rating] stars - clearly doing something right..."
+"Your [rating]-star rating stood out..."
+
+OPENER RULES:
+- NEVER start the same way twice in a batch
+- Style F (reviews) should be used sparingly
+- Styles A, B, C are highest-performing - use most often
+- Match the opener to the chosen FORMULA for this email
+
+============================================
+SUBJECT LINE - MAX 40 CHARACTERS
+============================================
+**HARD REQUIREMENTS:**
+- MAXIMUM 40 characters (mobile visibility)
+- Optimal: 25-35 characters
+- NO "Quick Q", "Quick question", or "Inquiry"
+- Create curiosity without clickbait
+
+Return valid JSON:
+{
+  "icebreaker": "your 3-4 sentence email (under 60 words, ending with question CTA)",
+  "subject_line": "25-40 characters MAX"
+}"""
+
 
 class AIProcessor:
     def __init__(self, api_key: str = None):
@@ -28,13 +381,111 @@ class AIProcessor:
             from config import OPENAI_API_KEY
             api_key = OPENAI_API_KEY
         
-        self.client = OpenAI(api_key=api_key)
-        logging.info(f"🤖 AIProcessor initialized with API key: {api_key[:15] if api_key else 'None'}...")
+        http_client = _shared_http_client()
+        
+        if AI_BASE_URL:
+            # Self-hosted OpenAI-compatible servers (vLLM) usually don't check the key
+            self.client = OpenAI(api_key=api_key or "EMPTY", base_url=AI_BASE_URL, http_client=http_client)
+            logging.info(f"🤖 AIProcessor initialized with endpoint: {AI_BASE_URL}")
+        else:
+            self.client = OpenAI(api_key=api_key, http_client=http_client)
+            logging.info(f"🤖 AIProcessor initialized with API key: {api_key[:15] if api_key else 'None'}...")
+
+        # One long-lived pool for all AI calls: bounds total in-flight requests and avoids
+        # spawning a fresh set of threads for every page batch and contact batch.
+        # Only leaf calls are submitted here, so nested use cannot deadlock.
+        self._executor = ThreadPoolExecutor(max_workers=MAX_AI_WORKERS, thread_name_prefix="ai")
+
+        # Summaries of pages already seen (boilerplate pages repeat across sites), LRU-bounded
+        self._page_summary_cache: OrderedDict = OrderedDict()
+        self._page_summary_cache_lock = threading.Lock()
+
+    def close(self):
+        """Shut down the AI worker pool (the process-wide HTTP client stays open for other instances)"""
+        self._executor.shutdown(wait=True)
         
+    def _chat_completion(self, model: str, messages: List[Dict[str, str]], **kwargs):
+        """
+        Create a chat completion, pacing requests with the shared rate limiter
+
+        The response headers feed rate_limiter.update_openai_limits, so calls only
+        pause when OpenAI reports the request quota is nearly used up, and the number
+        of concurrent requests adapts to 429/5xx errors and reply latency.
+
+        Requests sharing the same leading messages (everything before the final
+        per-contact turn) get the same prompt_cache_key, so OpenAI routes them to
+        the servers that already cache that prefix.
+        """
+        if not AI_BASE_URL and len(messages) > 1 and 'extra_body' not in kwargs:
+            prefix = "\0".join(str(message.get('content') or '') for message in messages[:-1])
+            kwargs['extra_body'] = {"prompt_cache_key": hashlib.blake2b(prefix.encode(), digest_size=8).hexdigest()}
+        rate_limiter.wait_for_openai(model, tokens=self._estimate_tokens(messages, kwargs.get('max_tokens')))
+        with rate_limiter.openai_request(model):
+            raw_response = self.client.chat.completions.with_raw_response.create(model=model, messages=messages, **kwargs)
+        rate_limiter.update_openai_limits(raw_response.headers)
+        response = raw_response.parse()
+        usage = getattr(response, 'usage', None)
+        cached = getattr(getattr(usage, 'prompt_tokens_details', None), 'cached_tokens', None)
+        if cached is not None:
+            logging.debug("%s prompt: %s tokens, %s from cache", model, usage.prompt_tokens, cached)
+        return response
+
+    @staticmethod
+    def _icebreaker_response_format(model: str, with_website_summary: bool = False) -> Dict[str, Any]:
+        """Schema-constrained output where the model supports it, plain JSON mode otherwise (older models, custom endpoints)"""
+        if AI_BASE_URL or model not in _STRUCTURED_OUTPUT_MODELS:
+            return {"type": "json_object"}
+        return _ICEBREAKER_WITH_SUMMARY_RESPONSE_FORMAT if with_website_summary else _ICEBREAKER_RESPONSE_FORMAT
+
+    def _icebreaker_json(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
+        """Run an icebreaker request with the configured icebreaker model and parse its JSON reply"""
+        from config import AI_MODEL_ICEBREAKER, AI_TEMPERATURE
+        response = self._chat_completion(
+            model=AI_MODEL_ICEBREAKER,
+            messages=messages,
+            temperature=AI_TEMPERATURE,
+            response_format=self._icebreaker_response_format(AI_MODEL_ICEBREAKER)
+        )
+        return _json_loads(response.choices[0].message.content)
+
+    @staticmethod
+    def _estimate_tokens(messages: List[Dict[str, str]], max_tokens: Optional[int] = None) -> int:
+        """Rough token count of a request (~4 characters per token) plus the completion budget"""
+        prompt_chars = sum(len(message.get('content') or '') for message in messages)
+        return prompt_chars // 4 + (max_tokens or _DEFAULT_COMPLETION_TOKENS)
+
+    def _page_summary_key(self, content: str) -> bytes:
+        """Cache key for a page summary (changes with the prompt and model too)"""
+        from config import SUMMARY_PROMPT, AI_MODEL_SUMMARY
+        return hashlib.blake2b(f"{AI_MODEL_SUMMARY}\0{SUMMARY_PROMPT}\0{content}".encode(), digest_size=16).digest()
+
+    def _cached_page_summary(self, key: bytes) -> Optional[str]:
+        """Summary stored for a page key (None if not cached)"""
+        with self._page_summary_cache_lock:
+            summary = self._page_summary_cache.get(key)
+            if summary is not None:
+                self._page_summary_cache.move_to_end(key)
+            return summary
+
+    def _cache_page_summary(self, key: bytes, summary: str):
+        """Store a page summary, evicting the least recently used ones past PAGE_SUMMARY_CACHE_SIZE"""
+        from config import PAGE_SUMMARY_CACHE_SIZE
+        if not summary or summary == "no content":
+            return  # Also what failures return, so don't pin it
+        with self._page_summary_cache_lock:
+            self._page_summary_cache[key] = summary
+            self._page_summary_cache.move_to_end(key)
+            while len(self._page_summary_cache) > PAGE_SUMMARY_CACHE_SIZE:
+                self._page_summary_cache.popitem(last=False)
+
     def summarize_website_pages(self, page_summaries: List[Dict[str, Any]]) -> List[str]:
         """
         Summarize multiple website pages using AI (now with parallel processing)
         
+        Pages are sent SUMMARY_PAGES_PER_REQUEST at a time, so a typical site (home page
+        plus a few links) costs one request and the instructions are paid for once.
+        Pages identical to one summarized earlier reuse that summary.
+        
         Args:
             page_summaries: List of dictionaries with 'url' and 'content' keys
             
@@ -44,70 +495,114 @@ class AIProcessor:
         if not page_summaries:
             return []
         
-        # Check if parallel processing is enabled
-        from config import ENABLE_PARALLEL_PROCESSING
-        if not ENABLE_PARALLEL_PROCESSING:
-            # Fallback to sequential processing
-            return self._summarize_pages_sequential(page_summaries)
+        from config import ENABLE_PARALLEL_PROCESSING, SUMMARY_PAGES_PER_REQUEST
         
-        summaries = [None] * len(page_summaries)  # Pre-allocate list to maintain order
+        summaries = ["no content"] * len(page_summaries)  # Pre-allocate list to maintain order
+        page_keys = {}
+        page_indexes = []
+        for i, page in enumerate(page_summaries):
+            content = page.get('content', '')
+            if _is_empty_page(content):
+                continue
+            page_keys[i] = self._page_summary_key(content)
+            cached = self._cached_page_summary(page_keys[i])
+            if cached is not None:
+                summaries[i] = cached
+            else:
+                page_indexes.append(i)
+        groups = [
+            page_indexes[start:start + SUMMARY_PAGES_PER_REQUEST]
+            for start in range(0, len(page_indexes), SUMMARY_PAGES_PER_REQUEST)
+        ]
         
-        with ThreadPoolExecutor(max_workers=min(MAX_AI_WORKERS, len(page_summaries))) as executor:
-            # Submit all summarization tasks
-            future_to_index = {}
-            for i, page in enumerate(page_summaries):
-                content = page.get('content', '')
-                if not content or content.strip() == '<div>empty</div>':
-                    summaries[i] = "no content"
-                    continue
-                
-                future = executor.submit(self._generate_page_summary_with_rate_limit, content)
-                future_to_index[future] = i
-            
-            # Collect results as they complete
-            for future in as_completed(future_to_index):
-                index = future_to_index[future]
+        def contents(group: List[int]) -> List[str]:
+            return [page_summaries[i]['content'] for i in group]
+        
+        def log_group_error(group: List[int], e: Exception):
+            urls = ", ".join(page_summaries[i].get('url', 'unknown') for i in group)
+            logging.error(f"Error summarizing pages {urls}: {e}")
+        
+        if not ENABLE_PARALLEL_PROCESSING:
+            # Fallback to sequential processing
+            for group in groups:
                 try:
-                    summary = future.result()
-                    summaries[index] = summary
+                    for index, summary in zip(group, self._summarize_page_group(contents(group))):
+                        summaries[index] = summary
+                        self._cache_page_summary(page_keys[index], summary)
                 except Exception as e:
-                    logging.error(f"Error summarizing page {page_summaries[index].get('url', 'unknown')}: {e}")
-                    summaries[index] = "no content"
+                    log_group_error(group, e)
+            return summaries
         
-        return summaries
-    
-    def _summarize_pages_sequential(self, page_summaries: List[Dict[str, Any]]) -> List[str]:
-        """Fallback sequential processing"""
-        summaries = []
-        for page in page_summaries:
+        # Submit all summarization tasks and collect results as they complete
+        future_to_group = {
+            self._executor.submit(self._summarize_page_group, contents(group)): group
+            for group in groups
+        }
+        for future in as_completed(future_to_group):
+            group = future_to_group[future]
             try:
-                content = page.get('content', '')
-                if not content or content.strip() == '<div>empty</div>':
-                    summaries.append("no content")
-                    continue
-                
-                summary = self._generate_page_summary(content)
-                summaries.append(summary)
-                
-                # Use rate limiter instead of fixed delay
-                reload_config()
-                from config import AI_MODEL_SUMMARY
-                rate_limiter.wait_for_openai(AI_MODEL_SUMMARY)
-                
+                for index, summary in zip(group, future.result()):
+                    summaries[index] = summary
+                    self._cache_page_summary(page_keys[index], summary)
             except Exception as e:
-                logging.error(f"Error summarizing page {page.get('url', 'unknown')}: {e}")
-                summaries.append("no content")
+                log_group_error(group, e)
         
         return summaries
     
-    def _generate_page_summary_with_rate_limit(self, content: str) -> str:
-        """Generate a summary with rate limiting"""
-        # Wait for rate limit
-        reload_config()
-        from config import AI_MODEL_SUMMARY
-        rate_limiter.wait_for_openai(AI_MODEL_SUMMARY)
-        
-        return self._generate_page_summary(content)
+    def _summarize_page_group(self, contents: List[str]) -> List[str]:
+        """Summarize pages with one request, or one request per page if the combined reply is unusable"""
+        if len(contents) > 1:
+            summaries = self._generate_page_summaries(contents)
+            if summaries:
+                return summaries
+        return [self._generate_page_summary(content) for content in contents]
+    
+    def _generate_page_summaries(self, contents: List[str]) -> Optional[List[str]]:
+        """Generate summaries for several pages with a single request (None if the reply can't be used)"""
+        try:
+            # Reload config to get latest prompts from UI
+            reload_config()
+            from config import SUMMARY_PROMPT, AI_MODEL_SUMMARY, AI_TEMPERATURE
+            
+            pages = "\n\n".join(f"[{number}]\n{content}" for number, content in enumerate(contents, 1))
+            messages = [
+                {
+                    "role": "system",
+                    "content": "You're a helpful, intelligent website scraping assistant. Always return responses in JSON format."
+                },
+                {
+                    "role": "user", 
+                    "content": SUMMARY_PROMPT
+                },
+                {
+                    "role": "user",
+                    "content": (
+                        f"There are {len(contents)} pages below, numbered [1] to [{len(contents)}]. "
+                        "Write a separate abstract for each page and return them in this JSON format, "
+                        "one abstract per page in the same order:\n\n"
+                        '{"abstracts":["abstract of page 1","abstract of page 2"]}\n\n'
+                        f"{pages}"
+                    )
+                }
+            ]
+            
+            response = self._chat_completion(
+                model=AI_MODEL_SUMMARY,
+                messages=messages,
+                temperature=AI_TEMPERATURE,
+                response_format={"type": "json_object"}
+            )
+            
+            abstracts = _json_loads(response.choices[0].message.content).get('abstracts')
+            if not isinstance(abstracts, list) or len(abstracts) != len(contents):
+                logging.warning("Combined page summary returned %s abstracts for %s pages, summarizing pages one by one",
+                                len(abstracts) if isinstance(abstracts, list) else 0, len(contents))
+                return None
+            return [abstract if isinstance(abstract, str) and abstract else "no content" for abstract in abstracts]
+            
+        except Exception as e:
+            logging.error(f"Error generating combined page summary: {e}")
+            return None
     
     def _generate_page_summary(self, content: str) -> str:
         """Generate a summary for a single page"""
@@ -131,7 +626,7 @@ class AIProcessor:
                 }
             ]
             
-            response = self.client.chat.completions.create(
+            response = self._chat_completion(
                 model=AI_MODEL_SUMMARY,
                 messages=messages,
                 temperature=AI_TEMPERATURE,
@@ -141,15 +636,15 @@ class AIProcessor:
             result = response.choices[0].message.content
             
             # Parse JSON response
-            import json
-            parsed = json.loads(result)
+            parsed = _json_loads(result)
             return parsed.get('abstract', 'no content')
             
         except Exception as e:
             logging.error(f"Error generating page summary: {e}")
             return "no content"
     
-    def generate_icebreaker(self, contact_info: Dict[str, Any], website_summaries: List[str], organization_data: Dict[str, Any] = None, template: str = None) -> Dict[str, str]:
+    def generate_icebreaker(self, contact_info: Dict[str, Any], website_summaries: List[str], organization_data: Dict[str, Any] = None, template: str = None,
+                            summarize_website: bool = False) -> Dict[str, str]:
         """
         Generate a personalized icebreaker AND subject line for a contact
 
@@ -159,12 +654,13 @@ class AIProcessor:
             organization_data: Organization/product information (product_name, product_description, value_proposition, etc.)
             template: Icebreaker template to use (specific_question, peer_social_proof, website_insight,
                       problem_agitation, curiosity_hook, direct_value, or 'auto' for weighted random)
+            summarize_website: website_summaries holds raw page content; also ask the model for a
+                               website summary, returned as 'website_summaries'
 
         Returns:
             Dictionary with 'icebreaker', 'subject_line', 'template_used', and 'formula_used' keys
         """
         try:
-            import random
             # Reload config to get latest prompts and settings from UI
             reload_config()
             from config import ICEBREAKER_PROMPT, AI_MODEL_ICEBREAKER, AI_TEMPERATURE, ORGANIZATION_CONFIG
@@ -175,8 +671,8 @@ class AIProcessor:
             email_status = contact_info.get('email_status', '')
             
             # Detect generic business emails
-            generic_prefixes = ['info@', 'contact@', 'hello@', 'sales@', 'support@', 'admin@', 'office@']
-            is_generic_email = any(email.lower().startswith(prefix) for prefix in generic_prefixes)
+            local_part, at, _ = email.partition('@')
+            is_generic_email = bool(at) and local_part.lower() in _GENERIC_EMAIL_LOCAL_PARTS
             
             # If it's a business contact or generic email, use B2B approach
             if is_business_contact or is_generic_email or email_status == 'business_email':
@@ -213,21 +709,8 @@ class AIProcessor:
 - Focus on industry-specific pain points or opportunities"""
             
             # Add variation instructions to reduce repetitive patterns
-            variation_instructions = random.choice([
-                "\n\nSTYLE: Start with a question about their business.",
-                "\n\nSTYLE: Lead with an observation about their industry.",
-                "\n\nSTYLE: Open with their name and a direct statement.",
-                "\n\nSTYLE: Begin with an insight about their market.",
-                "\n\nSTYLE: Start with what caught your attention.",
-            ])
-            
-            connection_style = random.choice([
-                "Make the connection to our solution subtle and natural.",
-                "Be direct about how we can help.",
-                "Focus on their pain point first, then our solution.",
-                "Highlight a specific opportunity we can address.",
-                "Connect through a shared challenge in their industry.",
-            ])
+            variation_instructions = random.choice(_OPENING_STYLES)
+            connection_style = random.choice(_CONNECTION_STYLES)
             
             # Replace variables in the prompt with actual values
             prompt_with_values = ICEBREAKER_PROMPT
@@ -241,123 +724,23 @@ class AIProcessor:
                 location_state = contact_info.get('organization', {}).get('state', '') or contact_info.get('state', '')
                 location = f"{location_city}, {location_state}" if location_city else "your area"
                 
-                # Replace all template variables
-                prompt_with_values = prompt_with_values.replace('{{company_name}}', business_name)
-                prompt_with_values = prompt_with_values.replace('{{business_type}}', business_type)
-                prompt_with_values = prompt_with_values.replace('{{location}}', location)
-                prompt_with_values = prompt_with_values.replace('{{website_summaries}}', website_content)
+                values = {
+                    'company_name': business_name,
+                    'business_type': business_type,
+                    'location': location,
+                    'website_summaries': website_content,
+                }
+                prompt_with_values = _fill_template_variables(prompt_with_values, values)
             
             # Add random subject line style variation
-            subject_line_styles = [
-                "curiosity-gap", "value-driven", "specific-observation",
-                "pattern-interrupt", "direct-benefit", "social-proof",
-                "location-specific", "industry-insight", "unexpected-angle"
-            ]
-            chosen_style = random.choice(subject_line_styles)
-
-            # Enhanced prompt that DEMANDS unique, high-converting subject lines
-            enhanced_prompt = prompt_with_values + variation_instructions + "\n" + connection_style + f"""
-
-CRITICAL: CREATE A UNIQUE, HIGH-CONVERTING EMAIL SUBJECT LINE
-
-MANDATORY REQUIREMENTS:
-1. Length: 25-45 characters (mobile-optimized)
-2. Style for this email: {chosen_style.upper().replace('-', ' ')}
-3. MUST be UNIQUE - NO GENERIC PATTERNS ALLOWED
-4. Use SPECIFIC details from the business (location, category, rating, name)
-
-❌ ABSOLUTELY FORBIDDEN PATTERNS (do NOT use these):
-- "Inquiry for [X]" or "Inquiry about [X]"
-- "Quick question about [X]"
-- "Question about [X]"
-- "Re: [X]"
-- "Regarding [X]"
-- "[Company]'s [thing]"
-- Any variation of "quick question"
-- Generic greetings like "Hello" or "Hi there"
-
-✅ REQUIRED PERSONALIZATION - Pick ONE approach and execute it PERFECTLY:
-
-1. LOCATION-SPECIFIC (if location available):
-   - "[City] [category] owners listen up"
-   - "Your [category] spot in [City]"
-   - "[Neighborhood] [business type] idea"
-   Example: "Brooklyn cafe owners listen up"
-
-2. RATING/REPUTATION (if rating >= 4.0):
-   - "Your [rating]★ secret?"
-   - "[X] stars - here's how to 5"
-   - "Top-rated [category] in [city]"
-   Example: "Your 4.8★ secret?"
-
-3. CATEGORY-SPECIFIC INSIGHT:
-   - "[Category] revenue trick"
-   - "Most [category]s miss this"
-   - "[Category] automation FYI"
-   Example: "Restaurant revenue trick"
-
-4. PATTERN INTERRUPT:
-   - "[Business name] → more [desired outcome]"
-   - "re: your [category] biz"
-   - "[Business] question from [your name]"
-   Example: "Joe's Coffee → more walk-ins"
-
-5. SOCIAL PROOF:
-   - "17 [category]s use this"
-   - "[City] [category]s switching to..."
-   - "Your competitor just did this"
-   Example: "17 dentists use this"
-
-6. VALUE-SPECIFIC:
-   - "3x more [outcome] for [category]"
-   - "[Category] bookings system"
-   - "Save [X] hours weekly"
-   Example: "3x more orders for restaurants"
-
-7. CURIOSITY WITH SPECIFICITY:
-   - "What [X] [category]s know"
-   - "[Business] missing out?"
-   - "This helps busy [category] owners"
-   Example: "What top cafes know"
-
-8. UNEXPECTED ANGLE:
-   - "Your [category] website issue"
-   - "[Business] Google visibility"
-   - "Noticed [Business]'s [specific thing]"
-   Example: "Your restaurant's Google ranking"
-
-COMPOSITION RULES:
-- Use numbers when possible (3x, 17, 5 stars)
-- Reference their specific business name OR category (not both)
-- If they have location, use it creatively
-- If they have high rating, reference it
-- Be conversational, not corporate
-- Create curiosity WITHOUT clickbait
-- Test would YOU open this email?
-
-EXAMPLES OF HIGH-CONVERTING SUBJECT LINES:
-- "Brooklyn pizza spot opportunity" (location + category)
-- "Your 4.9★ reviews → more sales" (rating + benefit)
-- "Dental practice automation FYI" (category + value)
-- "23 NYC cafes switched" (social proof + location)
-- "Joe's Diner visibility issue" (name + specific problem)
-- "Austin restaurant owners" (location + category)
-- "Your competitor just did this" (competitive angle)
-- "Bakery order system upgrade" (category + specific)
-
-QUALITY CHECK - Your subject line MUST:
-✓ Be 25-45 characters
-✓ Use at LEAST ONE specific detail (name/location/category/rating)
-✓ NOT use any forbidden patterns
-✓ Create genuine curiosity
-✓ Sound natural when read aloud
-✓ Be different from "inquiry" or "question" patterns
-
-Return your response in this EXACT JSON format:
-{{
-  "icebreaker": "your personalized icebreaker message",
-  "subject_line": "your unique, high-converting subject line (25-45 chars)"
-}}"""
+            chosen_style = random.choice(_SUBJECT_LINE_STYLES)
+
+            # Enhanced prompt that DEMANDS unique, high-converting subject lines.
+            # It stays identical across contacts so the provider's prompt cache can reuse the
+            # whole prefix; the per-contact random style choices go in the final message.
+            enhanced_prompt = prompt_with_values + _SUBJECT_LINE_RULES
+            if summarize_website:
+                enhanced_prompt += _WEBSITE_SUMMARY_INSTRUCTIONS
             
             messages = [
                 {
@@ -370,27 +753,27 @@ Return your response in this EXACT JSON format:
                 },
                 {
                     "role": "assistant",
-                    "content": """{"icebreaker":"Hey Aina,\\n\\nLove what you're doing at Maki. Also doing some outsourcing right now, wanted to run something by you.\\n\\nSo I hope you'll forgive me, but I creeped you/Maki quite a bit. I know that discretion is important to you guys (or at least I'm assuming this given the part on your website about white-labelling your services) and I put something together a few months ago that I think could help. To make a long story short, it's an outreach system that uses AI to find people hiring website devs. Then pitches them with templates (actually makes them a white-labelled demo website). Costs just a few cents to run, very high converting, and I think it's in line with Maki's emphasis on scalability.","subject_line":"Quick question about Maki's scaling"}"""
+                    "content": _ICEBREAKER_EXAMPLE
                 },
                 {
                     "role": "user",
-                    "content": f"Profile: {profile}\n\nWebsite: {website_content}"
+                    "content": f"{variation_instructions}\n{connection_style}\nSUBJECT LINE STYLE: {chosen_style.upper().replace('-', ' ')}"
+                               f"\n\nProfile: {profile}\n\nWebsite: {website_content}"
                 }
             ]
             
-            response = self.client.chat.completions.create(
+            response = self._chat_completion(
                 model=AI_MODEL_ICEBREAKER,
                 messages=messages,
                 temperature=AI_TEMPERATURE,
-                response_format={"type": "json_object"}
+                response_format=self._icebreaker_response_format(AI_MODEL_ICEBREAKER, with_website_summary=summarize_website)
             )
             
             result = response.choices[0].message.content
             
             # Parse JSON response with robust error handling
-            import json
             try:
-                parsed = json.loads(result)
+                parsed = _json_loads(result)
             except json.JSONDecodeError as e:
                 logging.error(f"Failed to parse AI response as JSON: {e}")
                 logging.error(f"Raw response: {result}")
@@ -400,13 +783,11 @@ Return your response in this EXACT JSON format:
             icebreaker = parsed.get('icebreaker', '').strip()
             subject_line = parsed.get('subject_line', '').strip()
             
-            # Validate and potentially fix subject line
-            if not subject_line:
-                # Generate fallback subject if missing
-                if company_name:
-                    subject_line = f"Quick question about {company_name[:20]}"
-                else:
-                    subject_line = f"Quick question, {first_name}"
+            # Validate and potentially fix subject line (missing, or one of the forbidden patterns)
+            if not subject_line or _FORBIDDEN_SUBJECT_RE.search(subject_line):
+                if subject_line:
+                    logging.debug("Replacing forbidden subject line: %s", subject_line)
+                subject_line = self._create_fallback_subject(first_name, company_name)
             
             # Ensure subject line isn't too long (trim if needed) - Bug #6 fix
             # RESEARCH: 40 chars max for mobile visibility (33 chars shows on most devices)
@@ -421,24 +802,156 @@ Return your response in this EXACT JSON format:
                     subject_line = self._create_fallback_subject(first_name, company_name)
                 return {"icebreaker": fallback, "subject_line": subject_line}
             
-            logging.info(f"Generated icebreaker and subject for {first_name} {last_name}")
-            logging.debug(f"Subject line ({len(subject_line)} chars): {subject_line}")
-            return {"icebreaker": icebreaker, "subject_line": subject_line}
+            logging.info("Generated icebreaker and subject for %s %s", first_name, last_name)
+            logging.debug("Subject line (%s chars): %s", len(subject_line), subject_line)
+            response_data = {"icebreaker": icebreaker, "subject_line": subject_line}
+            website_summary = str(parsed.get('website_summary') or '').strip()
+            if summarize_website and website_summary and website_summary != 'no content':
+                response_data['website_summaries'] = [website_summary]
+            return response_data
             
         except Exception as e:
             # Smart retry logic for rate limits and temporary errors
             return self._handle_ai_error(e, contact_info, website_summaries)
-    
+
+    def generate_summary_and_icebreaker(self, contact_info: Dict[str, Any], page_summaries: List[Dict[str, Any]],
+                                        organization_data: Dict[str, Any] = None, template: str = None) -> Dict[str, str]:
+        """
+        Summarize a contact's website and write the icebreaker in a single AI call
+
+        Args:
+            contact_info: Contact information dictionary
+            page_summaries: Scraped pages (dicts with 'url' and 'content') from WebScraper
+            organization_data: Organization/product information
+            template: Icebreaker template to use
+
+        Returns:
+            Dictionary with 'icebreaker' and 'subject_line', plus 'website_summaries' when the
+            website was summarized (falls back to generate_icebreaker when there are no pages)
+        """
+        page_contents = []
+        for page in page_summaries or []:
+            content = page.get('content', '')
+            if not _is_empty_page(content):
+                page_contents.append(f"Page: {page.get('url', '')}\n{content}")
+
+        if not page_contents:
+            return self.generate_icebreaker(contact_info, contact_info.get('website_summaries', []), organization_data, template)
+
+        return self.generate_icebreaker(contact_info, page_contents, organization_data, template, summarize_website=True)
+
+    @staticmethod
+    def _contact_identity(contact_info: Dict[str, Any]) -> Optional[tuple]:
+        """
+        Fields that identify the person an icebreaker is written for (not the website content)
+
+        None when there's no email or website to tell people apart, so such contacts are
+        never merged.
+        """
+        organization = contact_info.get('organization') or {}
+        email = (contact_info.get('email') or '').lower()
+        website = (contact_info.get('website_url') or organization.get('website_url') or '').lower().rstrip('/')
+        if not email and not website:
+            return None
+        return (
+            contact_info.get('first_name') or '',
+            contact_info.get('last_name') or '',
+            email,
+            contact_info.get('headline') or '',
+            contact_info.get('company_name') or contact_info.get('name') or organization.get('name') or '',
+            website,
+        )
+
+    @staticmethod
+    def _prompt_size(contact_info: Dict[str, Any]) -> int:
+        """Characters of website content a contact's requests will carry (summaries, or pages still to summarize)"""
+        summaries = contact_info.get('website_summaries') or []
+        pages = contact_info.get('website_pages') or []
+        return sum(len(summary or '') for summary in summaries) + sum(len(page.get('content') or '') for page in pages)
+
+    def generate_icebreakers_batch(self, contact_infos: List[Dict[str, Any]], organization_data: Dict[str, Any] = None, template: str = None) -> List[Dict[str, str]]:
+        """
+        Generate icebreakers for a whole batch of contacts at once
+
+        All requests share this processor's OpenAI client and are kept in flight
+        together (up to MAX_AI_WORKERS) instead of paying one round trip per contact.
+
+        Args:
+            contact_infos: Contact information dictionaries, each with its 'website_summaries'
+                           (or unsummarized 'website_pages', summarized in the same call)
+            organization_data: Organization/product information passed to every contact
+            template: Icebreaker template passed to every contact
+
+        Returns:
+            List of icebreaker dictionaries in the same order as contact_infos
+        """
+        if not contact_infos:
+            return []
+
+        # The same person listed twice (duplicate rows in a lead list) is generated once and fanned back out
+        first_index = {}
+        duplicate_of = {}
+        for i, contact_info in enumerate(contact_infos):
+            key = self._contact_identity(contact_info)
+            if key is None:
+                key = ('#', i)  # Unidentifiable contacts are never merged
+            if key in first_index:
+                duplicate_of[i] = first_index[key]
+            else:
+                first_index[key] = i
+        if duplicate_of:
+            unique_indices = list(first_index.values())
+            unique_results = self.generate_icebreakers_batch([contact_infos[i] for i in unique_indices], organization_data, template)
+            by_index = dict(zip(unique_indices, unique_results))
+            return [dict(by_index[duplicate_of.get(i, i)]) for i in range(len(contact_infos))]
+
+        results = [{} for _ in contact_infos]  # Pre-allocate list to maintain order
+
+        # Check if parallel processing is enabled
+        from config import ENABLE_PARALLEL_PROCESSING
+        if not ENABLE_PARALLEL_PROCESSING:
+            # Fallback to sequential processing
+            for index, contact_info in enumerate(contact_infos):
+                try:
+                    results[index] = self.generate_summary_and_icebreaker(
+                        contact_info, contact_info.get('website_pages', []), organization_data, template
+                    ) or {}
+                except Exception as e:
+                    logging.error(f"Error generating icebreaker for {contact_info.get('first_name', 'unknown')}: {e}")
+            return results
+
+        # Submit the largest prompts first so a long request doesn't start last and hold up the batch
+        order = sorted(range(len(contact_infos)), key=lambda i: self._prompt_size(contact_infos[i]), reverse=True)
+        future_to_index = {
+            self._executor.submit(
+                self.generate_summary_and_icebreaker,
+                contact_infos[i],
+                contact_infos[i].get('website_pages', []),
+                organization_data,
+                template
+            ): i
+            for i in order
+        }
+
+        for future in as_completed(future_to_index):
+            index = future_to_index[future]
+            try:
+                results[index] = future.result() or {}
+            except Exception as e:
+                logging.error(f"Error generating icebreaker for {contact_infos[index].get('first_name', 'unknown')}: {e}")
+
+        return results
+
     def _handle_ai_error(self, error: Exception, contact_info: dict, website_summaries: list, attempt: int = 1) -> dict:
         """Handle AI API errors with smart retry logic"""
-        import time
         error_str = str(error).lower()
         first_name = contact_info.get('first_name', 'unknown')
         
         # Rate limit error (429) - wait and retry
         if "rate" in error_str or "429" in error_str:
             if attempt <= 3:
-                wait_time = 60 + (attempt * 20)  # 60s, 80s, 100s
+                # Honor the server's retry-after when given, else 60s, 80s, 100s
+                wait_time = retry_after_seconds(error) or 60 + (attempt * 20)
                 logging.warning(f"⏰ Rate limit hit for {first_name}, waiting {wait_time}s (attempt {attempt}/3)")
                 time.sleep(wait_time)
                 return self._retry_icebreaker_generation(contact_info, website_summaries, attempt + 1)
@@ -489,7 +1002,6 @@ Return your response in this EXACT JSON format:
     
     def _create_fallback_subject(self, first_name: str, company_name: str = None) -> str:
         """Create a fallback subject line with variety - NO GENERIC PATTERNS"""
-        import random
         if company_name and len(company_name) > 3:
             # Truncate company name if needed
             short_company = company_name[:20] if len(company_name) > 20 else company_name
@@ -898,12 +1410,10 @@ CTA: One question, under 6 words
             template: Optional template override ('auto', 'specific_question', 'peer_social_proof',
                       'website_insight', 'problem_agitation', 'curiosity_hook', 'direct_value')
         """
-        import random
 
         try:
             # Reload config
             reload_config()
-            from config import AI_MODEL_ICEBREAKER, AI_TEMPERATURE
 
             # Get business information with rich context
             business_name = contact_info.get('name') or contact_info.get('organization', {}).get('name', '')
@@ -1014,8 +1524,6 @@ CTA: One question, under 6 words
             # - Single CTA under 6 words performs best
 
             b2b_prompt = f"""
-Write a cold email that sounds like a real person wrote it. Goal: Get a reply.
-
 ============================================
 THEIR BUSINESS (personalize with this)
 ============================================
@@ -1040,87 +1548,11 @@ Value: {value_proposition if value_proposition else 'Not specified'}
 Perfect fit: {'Yes - be confident' if is_perfect_fit else 'Maybe - ask first'}
 
 ============================================
-WRITING RULES (critical for conversions)
-============================================
-
-**TONE:** Write like you're texting a business owner you respect but haven't met.
-- Short sentences. Casual punctuation.
-- No corporate speak. No buzzwords.
-- Sound like a person, not a company.
-
-**LENGTH:** 3-4 sentences MAX. Under 60 words total.
-- Busy people delete long emails without reading
-- If you can cut a word, cut it
-
-**STRUCTURE:**
-- Line 1: Hook them with something specific to THEM
-- Line 2: Connect it to what you do (briefly)
-- Line 3: Simple question CTA (under 6 words)
-
-**ABSOLUTELY FORBIDDEN (instant spam folder):**
-- "Quick question" - spam trigger
-- "Hope this finds you well" - AI tell
-- "reaching out" or "wanted to connect" - salesy
-- "crushing it" - fake flattery
-- Starting with "I noticed" or "I saw" - overused
-- "businesses like yours" - too vague
-- Anything over 4 sentences
-- Using "Dr. [Name]" unless you have their ACTUAL name (not from business name)
-- Promising to send materials, data, catalogs, or samples
-
-**CTA RULES (CRITICAL - research shows this matters most):**
-- ONE question only, under 6 words
-- Must be a question (ends with ?)
-- Low commitment: "Worth a look?" "Curious?" "Interested?"
-- DO NOT offer to send anything specific
-- DO NOT mention calls, demos, or meetings in first email
-
-**OPENER VARIETY (CRITICAL - pick ONE, DO NOT always use reviews):**
-
-IMPORTANT: Vary your opening style. If using reviews/ratings, limit to 30% of the time.
-
-Style A - Question Hook (best for engagement):
-"Do your patients ask for something to use between visits?"
-"Ever wonder why [competitor] gets more walk-ins?"
-
-Style B - Local Trend (builds credibility):
-"A few {city} {category}s started [doing X] this year..."
-"Noticed a trend among {city} {category}s lately..."
-
-Style C - Problem Lead (shows understanding):
-"One thing {category}s tell me: [specific pain point]..."
-"The biggest challenge I hear from {category} owners..."
-
-Style D - Website/Research Insight (when you have content):
-"Saw on your site that you [specific thing]..."
-"Your [specific service/page] caught my eye..."
-
-Style E - Direct Value (for perfect fits):
-"[Product] helps {category}s [specific outcome]..."
-"Quick way for {category}s to [benefit]..."
-
-Style F - Social Proof (sparingly):
-"[X] reviews at [rating] stars - clearly doing something right..."
-"Your [rating]-star rating stood out..."
-
-OPENER RULES:
-- NEVER start the same way twice in a batch
-- Style F (reviews) should be used sparingly
-- Styles A, B, C are highest-performing - use most often
-- Match the opener to the chosen FORMULA above
-
-============================================
-SUBJECT LINE - MAX 40 CHARACTERS
+SUBJECT LINE FOR THIS EMAIL
 ============================================
 STYLE: {chosen_subject_style}
 INSTRUCTION: {subject_instruction}
 
-**HARD REQUIREMENTS:**
-- MAXIMUM 40 characters (mobile visibility)
-- Optimal: 25-35 characters
-- NO "Quick Q", "Quick question", or "Inquiry"
-- Create curiosity without clickbait
-
 **EXAMPLES BY STYLE:**
 - BUSINESS_NAME: "saw {business_name[:12]}" (under 20 chars)
 - CITY_CATEGORY: "{city} {category[:8]}s" (location + category)
@@ -1128,45 +1560,30 @@ INSTRUCTION: {subject_instruction}
 - RE_STYLE: "re: your practice" (looks like reply)
 - DIRECT: "patient take-home" (benefit focused)
 - CURIOSITY: "{category[:10]} trend" (industry hook)
-
-Return valid JSON:
-{{
-  "icebreaker": "your 3-4 sentence email (under 60 words, ending with question CTA)",
-  "subject_line": "25-40 characters MAX"
-}}
 """
-            
+
+            # Static rules first (shared, cacheable prefix), business details last
             messages = [
                 {
                     "role": "system",
                     "content": "You're a professional B2B outreach specialist. Generate business-appropriate emails for generic business email addresses."
                 },
+                {
+                    "role": "user",
+                    "content": _B2B_WRITING_RULES
+                },
                 {
                     "role": "user",
                     "content": b2b_prompt
                 }
             ]
-            
-            response = self.client.chat.completions.create(
-                model=AI_MODEL_ICEBREAKER,
-                messages=messages,
-                temperature=AI_TEMPERATURE,
-                response_format={"type": "json_object"}
-            )
-            
-            result = response.choices[0].message.content
-            
-            # Parse JSON response
-            import json
-            parsed = json.loads(result)
+
+            parsed = self._icebreaker_json(messages)
 
             # Include which template was used for A/B tracking
             parsed['template_used'] = template_used
             parsed['formula_used'] = chosen_formula
 
-            # Wait for rate limit
-            rate_limiter.wait_for_openai(AI_MODEL_ICEBREAKER)
-
             return parsed
             
         except Exception as e:
@@ -1193,17 +1610,10 @@ Could you forward this to the owner or whoever handles new partnerships?
 Thanks!"""
 
             # Use random fallback subject instead of forbidden "Quick Q" pattern
-            import random
-            fallback_subjects = [
-                f"{safe_business_name[:20]} → more customers",
-                f"{safe_city} {safe_category[:15]}" if safe_city and safe_category else f"{safe_category[:20]} tip",
-                f"{safe_business_name[:15]} opportunity",
-                f"{safe_category[:20]} automation FYI" if safe_category else f"{safe_business_name[:20]} idea",
-                f"Idea for {safe_business_name[:18]}",
-            ]
+            fallback_subject = random.choice(_B2B_FALLBACK_SUBJECTS)
             return {
                 "icebreaker": fallback_email,
-                "subject_line": random.choice(fallback_subjects),
+                "subject_line": fallback_subject(safe_business_name, safe_category, safe_city),
                 "template_used": "fallback",
                 "formula_used": "fallback"
             }
@@ -1212,9 +1622,8 @@ Thanks!"""
         """Retry icebreaker generation with the same parameters"""
         try:
             # Reload config to get latest prompts and settings from UI
-            from config import reload_config
             reload_config()
-            from config import ICEBREAKER_PROMPT, AI_MODEL_ICEBREAKER, AI_TEMPERATURE
+            from config import ICEBREAKER_PROMPT
             
             # Prepare contact profile
             first_name = contact_info.get('first_name', '')
@@ -1236,7 +1645,7 @@ Thanks!"""
                 },
                 {
                     "role": "assistant",
-                    "content": """{"icebreaker":"Hey Aina,\\n\\nLove what you're doing at Maki. Also doing some outsourcing right now, wanted to run something by you.\\n\\nSo I hope you'll forgive me, but I creeped you/Maki quite a bit. I know that discretion is important to you guys (or at least I'm assuming this given the part on your website about white-labelling your services) and I put something together a few months ago that I think could help. To make a long story short, it's an outreach system that uses AI to find people hiring website devs. Then pitches them with templates (actually makes them a white-labelled demo website). Costs just a few cents to run, very high converting, and I think it's in line with Maki's emphasis on scalability."}"""
+                    "content": _ICEBREAKER_EXAMPLE
                 },
                 {
                     "role": "user",
@@ -1244,21 +1653,10 @@ Thanks!"""
                 }
             ]
             
-            response = self.client.chat.completions.create(
-                model=AI_MODEL_ICEBREAKER,
-                messages=messages,
-                temperature=AI_TEMPERATURE,
-                response_format={"type": "json_object"}
-            )
-            
-            result = response.choices[0].message.content
-            
-            # Parse JSON response
-            import json
-            parsed = json.loads(result)
+            parsed = self._icebreaker_json(messages)
             icebreaker = parsed.get('icebreaker', '')
             
-            logging.info(f"✅ Retry successful for {first_name} {last_name} (attempt {attempt})")
+            logging.info("✅ Retry successful for %s %s (attempt %s)", first_name, last_name, attempt)
             return {"icebreaker": icebreaker}
             
         except Exception as retry_error:
@@ -1268,9 +1666,11 @@ Thanks!"""
     def test_connection(self) -> bool:
         """Test if OpenAI API connection is working"""
         try:
-            # Test with a simple API call
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
+            # Test with a simple API call to the configured summary model (also served by custom AI_BASE_URL endpoints)
+            reload_config()
+            from config import AI_MODEL_SUMMARY
+            response = self._chat_completion(
+                model=AI_MODEL_SUMMARY,
                 messages=[{"role": "user", "content": "Hello"}],
                 max_tokens=5
             )
@@ -1296,24 +1696,11 @@ Thanks!"""
         Returns:
             List of contacts with added icebreakers
         """
-        processed_contacts = []
+        # Generate every icebreaker concurrently on the shared AI pool (failures come back empty)
+        icebreakers = self.generate_icebreakers_batch(contacts_with_summaries)
         
-        for contact in contacts_with_summaries:
-            try:
-                website_summaries = contact.get('website_summaries', [])
-                icebreaker = self.generate_icebreaker(contact, website_summaries)
-                
-                # Add icebreaker to contact data
-                contact['mutiline_icebreaker'] = icebreaker
-                processed_contacts.append(contact)
-                
-                # Rate limiting between contacts
-                time.sleep(DELAY_BETWEEN_AI_CALLS)
-                
-            except Exception as e:
-                logging.error(f"Error processing contact {contact.get('first_name', 'unknown')}: {e}")
-                # Add contact without icebreaker
-                contact['mutiline_icebreaker'] = "Error generating icebreaker"
-                processed_contacts.append(contact)
+        for contact, icebreaker in zip(contacts_with_summaries, icebreakers):
+            # Add icebreaker to contact data
+            contact['mutiline_icebreaker'] = icebreaker or "Error generating icebreaker"
         
-        return processed_contacts
\ No newline at end of file
+        return list(contacts_with_summaries)
\ No newline at end of file
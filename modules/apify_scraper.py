@@ -2,13 +2,33 @@ import requests
 import logging
 import time
 import os
-from typing import List, Dict, Any, Optional
-from config import APIFY_API_KEY, MAX_RETRIES, REQUEST_TIMEOUT
+from typing import List, Dict, Any, Optional, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from config import APIFY_API_KEY, MAX_RETRIES, REQUEST_TIMEOUT, APIFY_DATASET_PAGE_SIZE
+from .rate_limiter import rate_limiter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class ApifyScrapeError(Exception):
+    """An Apify scrape failed after some of its results were already handed to the caller"""
 
 class ApifyScraper:
-    def __init__(self, api_key: str = APIFY_API_KEY):
+    def __init__(self, api_key: str = APIFY_API_KEY, session: Optional[requests.Session] = None):
         self.api_key = api_key
         self.base_url = "https://api.apify.com/v2"
+        # Keep-alive session: status polls and dataset pages reuse one TLS connection
+        # to api.apify.com. Pass a session to share the pool with another Apify client.
+        self._owns_session = session is None
+        self.session = session if session is not None else requests.Session()
+
+    def close(self):
+        """Close the pooled connections (a session passed in by the caller is left open)"""
+        if self._owns_session:
+            self.session.close()
         
     def scrape_contacts(self, search_url: str, total_records: int = None) -> List[Dict[str, Any]]:
         """
@@ -19,8 +39,32 @@ class ApifyScraper:
             total_records: Maximum number of records to fetch
             
         Returns:
-            List of contact dictionaries
+            List of contact dictionaries (empty if the scrape fails)
         """
+        try:
+            return [contact for page in self.iter_contact_pages(search_url, total_records) for contact in page]
+        except Exception:
+            return []  # Already logged; a partial result set is no better than none
+
+    def iter_contact_pages(self, search_url: str, total_records: int = None) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Scrape contacts using Apify LinkedIn scraper, yielding them one dataset page at a time
+
+        The next page is downloaded while the caller handles the current one, so storing
+        contacts overlaps with fetching them and only a page or two is held in memory.
+
+        Args:
+            search_url: LinkedIn search URL to scrape
+            total_records: Maximum number of records to fetch
+
+        Yields:
+            Lists of up to APIFY_DATASET_PAGE_SIZE contact dictionaries
+
+        Raises:
+            ApifyScrapeError: If the scrape fails after some pages were already yielded, so
+                              the caller doesn't mistake the partial results for a complete scrape
+        """
+        pages_yielded = False
         try:
             # Get record count from environment or use parameter or default
             if total_records is None:
@@ -61,20 +105,24 @@ class ApifyScraper:
             
             if not start_response or start_response.status_code not in [200, 201]:
                 logging.error(f"❌ Failed to start Apify run: {start_response.status_code if start_response else 'No response'}")
-                return []
+                return
             
             run_data = start_response.json()
             run_id = run_data.get('data', {}).get('id')
             
             if not run_id:
                 logging.error("❌ No run ID returned from Apify")
-                return []
+                return
             
             logging.info(f"✅ Apify run started with ID: {run_id}")
             logging.info(f"⏳ Waiting for Apollo scrape to complete...")
             
-            # Step 2: Poll for completion and get results
-            return self._wait_for_run_completion(run_id, headers)
+            # Step 2: Poll for completion, then page through the results
+            dataset_id = self._wait_for_run_completion(run_id, headers)
+            if dataset_id:
+                for page in self._iter_dataset_pages(dataset_id, headers):
+                    pages_yielded = True
+                    yield page
                 
         except Exception as e:
             logging.error(f"❌ Error in Apify Apollo scraping: {e}")
@@ -83,17 +131,19 @@ class ApifyScraper:
             logging.info("   • Verify the Apollo URL format is valid")  
             logging.info("   • Try a smaller record count first (e.g., 50-100)")
             logging.info("   • Check Apify dashboard for actor run details")
-            return []
+            if pages_yielded:
+                raise ApifyScrapeError(f"Apify scrape of {search_url} failed partway through: {e}") from e
     
     def _make_request_with_retry(self, url: str, method: str = "GET", **kwargs) -> Optional[requests.Response]:
         """Make HTTP request with retry logic"""
         for attempt in range(MAX_RETRIES):
             try:
                 logging.info(f"🌐 Making request to Apify (attempt {attempt + 1}/{MAX_RETRIES})...")
+                rate_limiter.wait_for_apify()
                 if method.upper() == "POST":
-                    response = requests.post(url, timeout=REQUEST_TIMEOUT, **kwargs)
+                    response = self.session.post(url, timeout=REQUEST_TIMEOUT, **kwargs)
                 else:
-                    response = requests.get(url, timeout=REQUEST_TIMEOUT, **kwargs)
+                    response = self.session.get(url, timeout=REQUEST_TIMEOUT, **kwargs)
                 
                 if response.status_code in [200, 201]:
                     return response
@@ -116,8 +166,8 @@ class ApifyScraper:
         logging.error(f"All {MAX_RETRIES} attempts failed for {url}")
         return None
     
-    def _wait_for_run_completion(self, run_id: str, headers: dict) -> List[Dict[str, Any]]:
-        """Wait for Apify run to complete and return the results"""
+    def _wait_for_run_completion(self, run_id: str, headers: dict) -> Optional[str]:
+        """Wait for Apify run to complete and return the ID of its results dataset"""
         max_wait_time = 1800  # 30 minutes max wait time
         check_interval = 15   # Check every 15 seconds
         elapsed_time = 0
@@ -136,7 +186,7 @@ class ApifyScraper:
                     
                     if consecutive_failures >= max_consecutive_failures:
                         logging.error("❌ Too many consecutive connection failures - giving up")
-                        return []
+                        return None
                     
                     # Wait longer before retry when having connection issues
                     time.sleep(check_interval * 2)
@@ -154,28 +204,17 @@ class ApifyScraper:
                 if run_status == 'SUCCEEDED':
                     logging.info("✅ Apollo scrape completed successfully!")
                     
-                    # Get the dataset items
+                    # Get the dataset holding the results
                     dataset_id = run_data.get('data', {}).get('defaultDatasetId')
                     if not dataset_id:
                         logging.error("❌ No dataset ID found in completed run")
-                        return []
-                    
-                    # Fetch results from dataset
-                    dataset_url = f"{self.base_url}/datasets/{dataset_id}/items"
-                    dataset_response = self._make_request_with_retry(dataset_url, headers=headers)
-                    
-                    if not dataset_response:
-                        logging.error("❌ Failed to fetch dataset results")
-                        return []
-                    
-                    results = dataset_response.json()
-                    logging.info(f"📊 Retrieved {len(results)} contacts from Apollo")
+                        return None
                     
-                    return self._process_apify_response(results)
+                    return dataset_id
                 
                 elif run_status == 'FAILED':
                     logging.error(f"❌ Apollo scrape failed with status: {run_status}")
-                    return []
+                    return None
                 
                 elif run_status in ['RUNNING', 'READY']:
                     # Still running, wait and check again
@@ -197,14 +236,58 @@ class ApifyScraper:
                 
                 if consecutive_failures >= max_consecutive_failures:
                     logging.error("❌ Too many consecutive errors - giving up")
-                    return []
+                    return None
                 
                 # Wait longer before retry when having connection issues
                 time.sleep(check_interval * 2)
                 elapsed_time += check_interval * 2
         
         logging.error(f"❌ Apollo scrape timed out after {max_wait_time} seconds")
-        return []
+        return None
+    
+    def _iter_dataset_pages(self, dataset_id: str, headers: dict) -> Iterator[List[Dict[str, Any]]]:
+        """Yield processed contacts from a dataset one page at a time, prefetching the next page"""
+        dataset_url = f"{self.base_url}/datasets/{dataset_id}/items"
+        page_size = APIFY_DATASET_PAGE_SIZE
+        offset = 0
+        total_retrieved = 0
+        
+        with ThreadPoolExecutor(max_workers=1) as prefetcher:
+            next_page = prefetcher.submit(self._fetch_dataset_page, dataset_url, headers, offset, page_size)
+            while next_page is not None:
+                items = next_page.result()
+                if items is None:
+                    raise Exception(f"Failed to fetch Apify dataset {dataset_id} at offset {offset}")
+                if not items:
+                    break
+                
+                # Start downloading the following page before handing this one to the caller
+                offset += len(items)
+                next_page = None
+                if len(items) == page_size:
+                    next_page = prefetcher.submit(self._fetch_dataset_page, dataset_url, headers, offset, page_size)
+                
+                total_retrieved += len(items)
+                yield self._process_apify_response(items)
+        
+        logging.info(f"📊 Retrieved {total_retrieved} contacts from Apollo")
+    
+    def _fetch_dataset_page(self, dataset_url: str, headers: dict, offset: int, limit: int) -> Optional[List[Dict[str, Any]]]:
+        """Fetch one page of raw dataset items (None if the request failed)"""
+        dataset_response = self._make_request_with_retry(
+            dataset_url,
+            headers=headers,
+            params={"offset": offset, "limit": limit}
+        )
+        
+        if not dataset_response:
+            logging.error(f"❌ Failed to fetch dataset results (offset {offset})")
+            return None
+        
+        # Dataset pages are the largest payloads we decode; orjson parses them several times faster
+        if orjson is not None:
+            return orjson.loads(dataset_response.content)
+        return dataset_response.json()
     
     def _process_apify_response(self, data) -> List[Dict[str, Any]]:
         """Process the response from Apify and return ALL contact data for storage"""
@@ -296,7 +379,7 @@ class ApifyScraper:
                 "Authorization": f"Bearer {self.api_key}"
             }
             
-            response = requests.get(test_url, headers=headers, timeout=10)
+            response = self.session.get(test_url, headers=headers, timeout=10)
             
             if response.status_code == 200:
                 logging.info("Apify API connection successful")
@@ -11,12 +11,17 @@ import os
 from typing import List, Dict, Any, Optional, Union
 from urllib.parse import quote, urlparse
 from config import APIFY_API_KEY, MAX_RETRIES, REQUEST_TIMEOUT
+from .rate_limiter import rate_limiter
 
 class LocalBusinessScraper:
-    def __init__(self, api_key: str = APIFY_API_KEY, ai_processor = None):
+    def __init__(self, api_key: str = APIFY_API_KEY, ai_processor = None, session: Optional[requests.Session] = None):
         self.api_key = api_key
         self.base_url = "https://api.apify.com/v2"
 
+        # Keep-alive session for Apify API calls (pass one to share an existing pool)
+        self._owns_session = session is None
+        self.session = session if session is not None else requests.Session()
+
         # Actor IDs
         self.google_maps_actor = "nwua9Gu5YrADL7ZDj"  # Google Maps Scraper
 
@@ -26,6 +31,12 @@ class LocalBusinessScraper:
 
         # AI processor for icebreaker generation
         self.ai_processor = ai_processor
+
+    def close(self):
+        """Close the pooled connections (a session passed in by the caller is left open)"""
+        if self._owns_session:
+            self.session.close()
+        self.web_scraper.close()
         
     def scrape_local_businesses(self, search_query: str, location: str, max_results: int = 1000) -> List[Dict[str, Any]]:
         """
@@ -870,10 +881,12 @@ class LocalBusinessScraper:
         """Make HTTP request with retry logic"""
         for attempt in range(MAX_RETRIES):
             try:
+                # Shares the Apify token bucket with ApifyScraper (several search URLs can run at once)
+                rate_limiter.wait_for_apify()
                 if method.upper() == "POST":
-                    response = requests.post(url, timeout=REQUEST_TIMEOUT, **kwargs)
+                    response = self.session.post(url, timeout=REQUEST_TIMEOUT, **kwargs)
                 else:
-                    response = requests.get(url, timeout=REQUEST_TIMEOUT, **kwargs)
+                    response = self.session.get(url, timeout=REQUEST_TIMEOUT, **kwargs)
                 
                 if response.status_code in [200, 201]:
                     return response
@@ -965,7 +978,7 @@ class LocalBusinessScraper:
             test_url = f"{self.base_url}/acts"
             headers = {"Authorization": f"Bearer {self.api_key}"}
             
-            response = requests.get(test_url, headers=headers, timeout=10)
+            response = self.session.get(test_url, headers=headers, timeout=10)
             
             if response.status_code == 200:
                 logging.info("✅ Local Business Scraper API connection successful")
@@ -3,10 +3,43 @@ Rate limiting utilities for API calls
 Implements token bucket algorithm for smooth rate limiting
 """
 
+import re
 import time
 import threading
+from contextlib import contextmanager
 from typing import Dict, Optional
 import logging
+from config import (
+    OPENAI_GPT4_RPM, OPENAI_GPT4_MINI_RPM, OPENAI_GPT4_TPM, OPENAI_GPT4_MINI_TPM, APIFY_REQUESTS_PER_SECOND,
+    SUPABASE_REQUESTS_PER_SECOND, DOMAIN_REQUEST_DELAY, OPENAI_MIN_REMAINING_REQUESTS, OPENAI_MIN_REMAINING_TOKENS,
+    MAX_AI_WORKERS, OPENAI_LATENCY_TARGET
+)
+
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+_DURATION_SECONDS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+
+# HTTP statuses that mean the provider is overloaded (back off concurrency)
+_OVERLOAD_STATUSES = {429, 500, 502, 503, 504}
+
+
+def parse_reset_duration(value: str) -> float:
+    """Parse an OpenAI rate limit reset value like '1s', '6m0s' or '120ms' into seconds"""
+    return sum(float(amount) * _DURATION_SECONDS[unit] for amount, unit in _DURATION_PART.findall(value or ''))
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Seconds the provider asked us to wait (retry-after-ms / retry-after headers of an API error), if any"""
+    headers = getattr(getattr(error, 'response', None), 'headers', None)
+    if not headers:
+        return None
+    try:
+        if headers.get('retry-after-ms'):
+            return float(headers.get('retry-after-ms')) / 1000
+        if headers.get('retry-after'):
+            return float(headers.get('retry-after'))
+    except (TypeError, ValueError):
+        pass
+    return None
 
 class TokenBucket:
     """
@@ -62,11 +95,65 @@ class TokenBucket:
         """
         wait_time = self.consume(tokens)
         if wait_time > 0:
-            logging.debug(f"Rate limit: waiting {wait_time:.2f}s")
+            logging.debug("Rate limit: waiting %.2fs", wait_time)
             time.sleep(wait_time)
             self.consume(tokens)
 
 
+class AdaptiveConcurrencyLimiter:
+    """
+    Thread-safe cap on in-flight requests that adapts AIMD-style: the limit grows
+    additively while requests succeed within the latency target and halves when
+    the provider reports overload (429/5xx)
+    """
+    def __init__(self, max_limit: int, min_limit: int = 1, latency_target: float = 10.0,
+                 increase: float = 0.5, decrease: float = 0.5):
+        """
+        Initialize the limiter
+        
+        Args:
+            max_limit: Highest number of concurrent requests (also the starting limit)
+            min_limit: Lowest number of concurrent requests
+            latency_target: Seconds a successful request may take and still grow the limit
+            increase: Amount added to the limit after a fast success
+            decrease: Factor the limit is multiplied by after an overload error
+        """
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.latency_target = latency_target
+        self.increase = increase
+        self.decrease = decrease
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self.condition = threading.Condition()
+    
+    def acquire(self):
+        """Wait until fewer requests than the current limit are in flight"""
+        with self.condition:
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+    
+    def release(self, latency: float, overloaded: bool = False):
+        """
+        Finish a request and adjust the limit
+        
+        Args:
+            latency: Seconds the request took
+            overloaded: Whether the provider rejected it as overloaded
+        """
+        with self.condition:
+            self.in_flight -= 1
+            previous = int(self.limit)
+            if overloaded:
+                self.limit = max(float(self.min_limit), self.limit * self.decrease)
+            elif latency <= self.latency_target:
+                self.limit = min(self.max_limit, self.limit + self.increase)
+            if int(self.limit) != previous:
+                logging.debug("Concurrency limit: %s -> %s", previous, int(self.limit))
+            self.condition.notify_all()
+
+
 class DomainThrottler:
     """
     Throttle requests per domain to avoid IP blocking
@@ -107,7 +194,7 @@ class DomainThrottler:
                 elapsed = now - self.last_request[domain]
                 if elapsed < self.min_delay:
                     wait_time = self.min_delay - elapsed
-                    logging.debug(f"Domain throttle: waiting {wait_time:.2f}s for {domain}")
+                    logging.debug("Domain throttle: waiting %.2fs for %s", wait_time, domain)
                     time.sleep(wait_time)
                     now = time.time()
             
@@ -122,30 +209,118 @@ class APIRateLimiter:
         """Initialize rate limiters for different APIs"""
         # OpenAI rate limits (requests per minute converted to per second)
         self.openai_gpt4 = TokenBucket(
-            rate=10000 / 60,  # 10,000 RPM = 166.67 RPS
+            rate=OPENAI_GPT4_RPM / 60,  # 10,000 RPM = 166.67 RPS
             capacity=100  # Burst capacity
         )
         
         self.openai_gpt4_mini = TokenBucket(
-            rate=30000 / 60,  # 30,000 RPM = 500 RPS
+            rate=OPENAI_GPT4_MINI_RPM / 60,  # 30,000 RPM = 500 RPS
             capacity=200  # Burst capacity
         )
         
+        # OpenAI token quotas (tokens per minute, a few seconds' worth of burst)
+        self.openai_gpt4_tokens = TokenBucket(
+            rate=OPENAI_GPT4_TPM / 60,
+            capacity=OPENAI_GPT4_TPM / 10
+        )
+        
+        self.openai_gpt4_mini_tokens = TokenBucket(
+            rate=OPENAI_GPT4_MINI_TPM / 60,
+            capacity=OPENAI_GPT4_MINI_TPM / 10
+        )
+        
+        # Set from OpenAI response headers when the provider says we're about to be throttled
+        self.openai_resume_at = 0.0
+        self.openai_lock = threading.Lock()
+        
+        # Concurrent OpenAI requests per model, backed off on 429/5xx and grown back while
+        # replies are fast (models have independent limits, so one backing off doesn't slow the other)
+        self.openai_concurrency: Dict[str, AdaptiveConcurrencyLimiter] = {}
+        
         # Website scraping (conservative)
-        self.domain_throttler = DomainThrottler(min_delay=2.0)
+        self.domain_throttler = DomainThrottler(min_delay=DOMAIN_REQUEST_DELAY)
         
         # Apify (keep conservative)
         self.apify = TokenBucket(
-            rate=1,  # 1 request per second
-            capacity=5
+            rate=APIFY_REQUESTS_PER_SECOND,
+            capacity=APIFY_REQUESTS_PER_SECOND
+        )
+        
+        # Supabase REST API
+        self.supabase = TokenBucket(
+            rate=SUPABASE_REQUESTS_PER_SECOND,
+            capacity=SUPABASE_REQUESTS_PER_SECOND
         )
     
-    def wait_for_openai(self, model: str = "gpt-4o"):
-        """Wait for OpenAI rate limit"""
+    def wait_for_openai(self, model: str = "gpt-4o", tokens: int = 0):
+        """
+        Wait for OpenAI rate limit
+        
+        Args:
+            model: Model the request is for
+            tokens: Estimated tokens the request will use (prompt + completion)
+        """
+        with self.openai_lock:
+            pause = self.openai_resume_at - time.time()
+        if pause > 0:
+            logging.debug("OpenAI throttle: waiting %.2fs for rate limit reset", pause)
+            time.sleep(pause)
+        
         if "mini" in model.lower():
             self.openai_gpt4_mini.wait_and_consume()
+            if tokens:
+                self.openai_gpt4_mini_tokens.wait_and_consume(tokens)
         else:
             self.openai_gpt4.wait_and_consume()
+            if tokens:
+                self.openai_gpt4_tokens.wait_and_consume(tokens)
+    
+    @contextmanager
+    def openai_request(self, model: str = "gpt-4o"):
+        """Hold one of the model's adaptive OpenAI concurrency slots for the duration of a request"""
+        with self.openai_lock:
+            limiter = self.openai_concurrency.get(model)
+            if limiter is None:
+                limiter = self.openai_concurrency[model] = AdaptiveConcurrencyLimiter(
+                    MAX_AI_WORKERS, latency_target=OPENAI_LATENCY_TARGET
+                )
+        limiter.acquire()
+        started = time.monotonic()
+        overloaded = False
+        try:
+            yield
+        except Exception as e:
+            overloaded = getattr(e, 'status_code', None) in _OVERLOAD_STATUSES
+            # A 429 with retry-after applies to every worker, not just this request
+            retry_after = retry_after_seconds(e) if getattr(e, 'status_code', None) == 429 else None
+            if retry_after:
+                self.pause_openai(retry_after, "rate limited (retry-after)")
+            raise
+        finally:
+            limiter.release(time.monotonic() - started, overloaded)
+    
+    def update_openai_limits(self, headers):
+        """
+        Pause OpenAI calls when the response headers show the request or token quota is nearly used up
+        
+        Args:
+            headers: Response headers with x-ratelimit-remaining-requests / x-ratelimit-reset-requests
+                and x-ratelimit-remaining-tokens / x-ratelimit-reset-tokens
+        """
+        for quota, minimum in (('requests', OPENAI_MIN_REMAINING_REQUESTS), ('tokens', OPENAI_MIN_REMAINING_TOKENS)):
+            try:
+                remaining = int(headers.get(f'x-ratelimit-remaining-{quota}'))
+            except (TypeError, ValueError):
+                continue
+            if remaining <= minimum:
+                pause = parse_reset_duration(headers.get(f'x-ratelimit-reset-{quota}'))
+                self.pause_openai(pause, f"{quota} nearly exhausted ({remaining} left)")
+    
+    def pause_openai(self, seconds: float, reason: str):
+        """Hold every OpenAI call for the given number of seconds"""
+        with self.openai_lock:
+            self.openai_resume_at = max(self.openai_resume_at, time.time() + seconds)
+        logging.warning(f"OpenAI {reason} - pausing {seconds:.2f}s")
     
     def wait_for_website(self, domain: str):
         """Wait for website scraping rate limit"""
@@ -160,6 +335,10 @@ class APIRateLimiter:
     def wait_for_apify(self):
         """Wait for Apify rate limit"""
         self.apify.wait_and_consume()
+    
+    def wait_for_supabase(self):
+        """Wait for Supabase rate limit"""
+        self.supabase.wait_and_consume()
 
 
 # Global rate limiter instance
@@ -1,10 +1,14 @@
 import logging
 import os
 import json
+import queue
+import threading
+import time
 from typing import List, Dict, Any, Optional, Tuple
-from datetime import datetime
+from datetime import datetime, timedelta
 from supabase import create_client, Client
 import config
+from modules.rate_limiter import rate_limiter
 
 class SupabaseManager:
     def __init__(self, supabase_url: str = None, supabase_key: str = None, organization_id: str = None, audience_id: str = None):
@@ -27,6 +31,11 @@ class SupabaseManager:
             logging.error(f"❌ Failed to initialize Supabase client: {e}")
             raise
 
+    def _bulk_upsert(self, table: str, rows: List[Dict[str, Any]], on_conflict: str) -> List[Dict[str, Any]]:
+        """Upsert many rows in one request through the Supabase client and return the stored rows"""
+        result = self.client.table(table).upsert(rows, on_conflict=on_conflict).execute()
+        return result.data or []
+
     def _get_supabase_url(self) -> str:
         """Get Supabase URL from UI config or environment"""
         # Try UI config first, then environment
@@ -205,7 +214,7 @@ class SupabaseManager:
     def batch_insert_raw_contacts(self, contacts: List[Dict[str, Any]], search_url_id: str) -> int:
         """Batch insert raw contacts from Apollo/Apify"""
         try:
-            logging.info(f"🔍 DEBUG SUPABASE: batch_insert_raw_contacts called with {len(contacts)} contacts, search_url_id={search_url_id}")
+            logging.debug("🔍 DEBUG SUPABASE: batch_insert_raw_contacts called with %s contacts, search_url_id=%s", len(contacts), search_url_id)
             
             if not contacts:
                 logging.warning(f"🔍 DEBUG SUPABASE: No contacts provided - returning 0")
@@ -223,7 +232,7 @@ class SupabaseManager:
 
             # Prepare contacts for insertion
             processed_contacts = []
-            logging.info(f"🔍 DEBUG SUPABASE: Starting contact processing loop")
+            logging.debug("🔍 DEBUG SUPABASE: Starting contact processing loop")
             for i, contact in enumerate(contacts):
                 processed_contact = {
                     "search_url_id": search_url_id,
@@ -256,21 +265,22 @@ class SupabaseManager:
             batch_size = DATABASE_BATCH_SIZE  # Use smaller batch size (25 instead of 100)
             total_inserted = 0
             
-            logging.info(f"🔍 DEBUG SUPABASE: Processed {len(processed_contacts)} contacts, inserting in batches of {batch_size}")
+            logging.debug("🔍 DEBUG SUPABASE: Processed %s contacts, inserting in batches of %s", len(processed_contacts), batch_size)
             
             for i in range(0, len(processed_contacts), batch_size):
                 batch = processed_contacts[i:i + batch_size]
                 batch_num = i//batch_size + 1
                 
-                logging.info(f"🔍 DEBUG SUPABASE: Inserting batch {batch_num} with {len(batch)} contacts")
-                logging.info(f"🔍 DEBUG SUPABASE: Sample contact from batch: {batch[0] if batch else 'Empty batch'}")
+                # Lazy %-formatting: the sample row (with its raw JSON) is only rendered under DEBUG
+                logging.debug("🔍 DEBUG SUPABASE: Inserting batch %s with %s contacts", batch_num, len(batch))
+                logging.debug("🔍 DEBUG SUPABASE: Sample contact from batch: %s", batch[0] if batch else 'Empty batch')
                 
                 # Try batch insertion with retry logic
                 batch_inserted = self._insert_batch_with_retry(batch, batch_num, DATABASE_MAX_RETRIES)
                 total_inserted += batch_inserted
 
             logging.info(f"✅ SUPABASE SUCCESS: Total raw contacts processed: {total_inserted}")
-            logging.info(f"🔍 DEBUG SUPABASE: This includes new contacts + updated duplicates")
+            logging.debug("🔍 DEBUG SUPABASE: This includes new contacts + updated duplicates")
             return total_inserted
             
         except Exception as e:
@@ -288,10 +298,11 @@ class SupabaseManager:
         for attempt in range(max_retries):
             try:
                 # Use upsert to handle duplicates gracefully
-                result = self.client.table("raw_contacts").upsert(batch, on_conflict="apollo_id,search_url_id").execute()
+                rate_limiter.wait_for_supabase()
+                inserted = self._bulk_upsert("raw_contacts", batch, on_conflict="apollo_id,search_url_id")
                 
-                if result.data:
-                    inserted_count = len(result.data)
+                if inserted:
+                    inserted_count = len(inserted)
                     logging.info(f"✅ Batch {batch_num} inserted: {inserted_count} contacts (attempt {attempt + 1})")
                     return inserted_count
                 else:
@@ -342,6 +353,7 @@ class SupabaseManager:
         
         for i, contact in enumerate(batch):
             try:
+                rate_limiter.wait_for_supabase()
                 result = self.client.table("raw_contacts").upsert([contact], on_conflict="apollo_id,search_url_id").execute()
                 if result.data:
                     individual_count += len(result.data)
@@ -396,46 +408,136 @@ class SupabaseManager:
             logging.error(f"Error getting contacts for enrichment: {e}")
             return []
     
-    def get_unprocessed_contacts(self, limit: int = 100, min_confidence: float = 0.7) -> List[Dict[str, Any]]:
-        """Get unprocessed contacts that meet quality criteria (within organization context)"""
+    def get_unprocessed_contacts(self, limit: int = 100, min_confidence: float = 0.7, after_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get unprocessed contacts that meet quality criteria (within organization context)
+
+        See get_unprocessed_contacts_page, which also returns the keyset cursor.
+        """
+        contacts, _ = self.get_unprocessed_contacts_page(limit, min_confidence, after_id)
+        return contacts
+
+    def get_unprocessed_contacts_page(self, limit: int = 100, min_confidence: float = 0.7,
+                                      after_id: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Get the next page of unprocessed contacts that meet quality criteria
+
+        Contacts are returned in id order. Pass the returned cursor as after_id to page
+        through the queue by keyset instead of re-reading rows that are still being
+        processed (or that failed and stay unprocessed).
+
+        Contacts whose email already has a processed lead are marked processed, and repeats
+        of an email within the page are skipped (see _drop_duplicate_emails), so the same
+        person is never researched twice.
+
+        Returns:
+            Tuple of (contacts, id of the last raw contact scanned). The cursor also covers
+            the skipped repeats, so they aren't handed out again while the kept contact's
+            lead is still being written.
+        """
         try:
             logging.info(f"📋 Building query for unprocessed contacts...")
             logging.info(f"  - Organization ID: {self.organization_id}")
             logging.info(f"  - Limit: {limit}")
             logging.info(f"  - Min confidence: {min_confidence}")
-            
-            query = (
-                self.client.table("raw_contacts")
-                .select("*, search_urls!inner(url)")
-                .eq("processed", False)
-                .not_.is_("email", "null")
-                .not_.is_("website_url", "null")
-                .neq("website_url", "")
-                .eq("email_status", "verified")  # Only accept verified emails - no guessed ones
-            )
-            
-            if self.organization_id:
-                logging.info(f"  - Adding organization filter: {self.organization_id}")
-                query = query.eq("organization_id", self.organization_id)
-            
-            # Apply limit only if specified (None means get ALL contacts)
-            if limit is not None:
-                query = query.limit(limit)
-            
-            logging.info(f"🔍 Executing query...")
-            result = query.execute()
-            logging.info(f"🔍 Query returned {len(result.data or [])} unprocessed contacts")
-            
-            if result.data and len(result.data) > 0:
-                logging.info(f"  - First contact: {result.data[0].get('name', 'Unknown')} ({result.data[0].get('email', 'No email')})")
-            
-            return result.data or []
+            logging.info(f"  - After ID: {after_id}")
+            
+            while True:
+                query = (
+                    self.client.table("raw_contacts")
+                    .select("*, search_urls!inner(url)")
+                    .eq("processed", False)
+                    .not_.is_("email", "null")
+                    .neq("email", "")
+                    .not_.is_("website_url", "null")
+                    .neq("website_url", "")
+                    .eq("email_status", "verified")  # Only accept verified emails - no guessed ones
+                )
+                
+                if self.organization_id:
+                    query = query.eq("organization_id", self.organization_id)
+                
+                # Keyset pagination: continue after the last contact already handed out
+                if after_id:
+                    query = query.gt("id", after_id)
+                query = query.order("id")
+                
+                # Apply limit only if specified (None means get ALL contacts)
+                if limit is not None:
+                    query = query.limit(limit)
+                
+                logging.info(f"🔍 Executing query...")
+                rate_limiter.wait_for_supabase()
+                result = query.execute()
+                logging.info(f"🔍 Query returned {len(result.data or [])} unprocessed contacts")
+                
+                if result.data and len(result.data) > 0:
+                    logging.info(f"  - First contact: {result.data[0].get('name', 'Unknown')} ({result.data[0].get('email', 'No email')})")
+                
+                if not result.data:
+                    return [], after_id
+                contacts, _ = self._drop_duplicate_emails(result.data)
+                after_id = result.data[-1]["id"]
+                # A batch of nothing but duplicates doesn't mean the queue is empty;
+                # keep paging past it
+                if contacts:
+                    return contacts, after_id
             
         except Exception as e:
             import traceback
             logging.error(f"❌ Error fetching unprocessed contacts: {e}")
             logging.error(f"❌ Traceback:\n{traceback.format_exc()}")
-            return []
+            return [], after_id
+
+    def _drop_duplicate_emails(self, contacts: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Remove contacts already covered by another contact with the same email
+
+        Contacts whose email already produced a lead are marked processed. Repeats of an
+        email within this batch are only skipped: they stay unprocessed, so they are
+        picked up again (and then marked) by a later run, or retried if the kept
+        contact fails to produce a lead.
+
+        Returns:
+            Tuple of (unique contacts, number of duplicates marked processed)
+        """
+        if not contacts:
+            return contacts, 0
+
+        emails = list({contact["email"] for contact in contacts if contact.get("email")})
+        emails += [email.lower() for email in emails if email.lower() != email]
+        existing = set()
+        try:
+            # Emails that already produced a lead (e.g. the same person from an overlapping search URL)
+            rate_limiter.wait_for_supabase()
+            query = self.client.table("processed_leads").select("email").in_("email", emails)
+            if self.organization_id:
+                query = query.eq("organization_id", self.organization_id)
+            existing.update((row.get("email") or "").lower() for row in (query.execute().data or []))
+        except Exception as e:
+            logging.warning(f"⚠️ Could not check existing leads for duplicate emails: {e}")
+
+        unique_contacts = []
+        existing_lead_ids = []
+        seen = set()
+        skipped = 0
+        for contact in contacts:
+            email = (contact.get("email") or "").lower()
+            if email in existing:
+                existing_lead_ids.append(contact["id"])
+            elif email in seen:
+                skipped += 1
+            else:
+                seen.add(email)
+                unique_contacts.append(contact)
+
+        if skipped:
+            logging.info(f"🔁 Skipping {skipped} contacts that repeat an email in this batch")
+        duplicates_marked = 0
+        if existing_lead_ids:
+            logging.info(f"🔁 Skipping {len(existing_lead_ids)} contacts whose email already has a lead")
+            duplicates_marked = self.mark_contacts_processed_bulk(existing_lead_ids)
+        return unique_contacts, duplicates_marked
 
     def update_contact_email(self, contact_id: str, email: str, email_status: str = "verified") -> bool:
         """Update a contact's email after website scraping"""
@@ -462,6 +564,7 @@ class SupabaseManager:
     def mark_contact_processed(self, contact_id: str) -> bool:
         """Mark a raw contact as processed"""
         try:
+            rate_limiter.wait_for_supabase()
             result = (
                 self.client.table("raw_contacts")
                 .update({"processed": True})
@@ -480,33 +583,61 @@ class SupabaseManager:
             logging.error(f"Error marking contact as processed: {e}")
             return False
 
+    def mark_contacts_processed_bulk(self, contact_ids: List[str]) -> int:
+        """Mark many raw contacts as processed with a single UPDATE"""
+        if not contact_ids:
+            return 0
+
+        try:
+            rate_limiter.wait_for_supabase()
+            result = (
+                self.client.table("raw_contacts")
+                .update({"processed": True})
+                .in_("id", contact_ids)
+                .execute()
+            )
+
+            updated_count = len(result.data or [])
+            logging.info(f"✅ Marked {updated_count}/{len(contact_ids)} contacts as processed")
+            return updated_count
+
+        except Exception as e:
+            logging.error(f"Error bulk marking contacts as processed: {e}")
+            return 0
+
     # Processed Leads Management
+    def build_processed_lead_row(self, raw_contact_id: str, search_url_id: str,
+                                 lead_data: Dict[str, Any], processing_settings: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a processed_leads row (within organization context)"""
+        return {
+            "raw_contact_id": raw_contact_id,
+            "search_url_id": search_url_id,
+            "first_name": lead_data.get("first_name", ""),
+            "last_name": lead_data.get("last_name", ""),
+            "email": lead_data.get("email", ""),
+            "linkedin_url": lead_data.get("linkedin_url", ""),
+            "headline": lead_data.get("headline", ""),
+            "website_url": lead_data.get("website_url", ""),
+            "location": lead_data.get("location", ""),
+            "icebreaker": lead_data.get("icebreaker", ""),
+            "subject_line": lead_data.get("subject_line", ""),
+            "website_summaries": lead_data.get("website_summaries", []),
+            "processing_settings_used": processing_settings,
+            "organization_id": self.organization_id,
+            "status": "new"
+        }
+
     def create_processed_lead(self, raw_contact_id: str, search_url_id: str, 
                             lead_data: Dict[str, Any], processing_settings: Dict[str, Any]) -> Dict[str, Any]:
         """Create a processed lead with AI-generated content (within organization context)"""
         try:
-            data = {
-                "raw_contact_id": raw_contact_id,
-                "search_url_id": search_url_id,
-                "first_name": lead_data.get("first_name", ""),
-                "last_name": lead_data.get("last_name", ""),
-                "email": lead_data.get("email", ""),
-                "linkedin_url": lead_data.get("linkedin_url", ""),
-                "headline": lead_data.get("headline", ""),
-                "website_url": lead_data.get("website_url", ""),
-                "location": lead_data.get("location", ""),
-                "icebreaker": lead_data.get("icebreaker", ""),
-                "subject_line": lead_data.get("subject_line", ""),
-                "website_summaries": lead_data.get("website_summaries", []),
-                "processing_settings_used": processing_settings,
-                "organization_id": self.organization_id,
-                "status": "new"
-            }
+            data = self.build_processed_lead_row(raw_contact_id, search_url_id, lead_data, processing_settings)
             
-            logging.info(f"🔍 DEBUG: Inserting lead data: {data['first_name']} {data['last_name']}")
-            logging.info(f"🔍 DEBUG: Icebreaker length: {len(data['icebreaker'])} chars")
+            logging.debug("🔍 DEBUG: Inserting lead data: %s %s", data['first_name'], data['last_name'])
+            logging.debug("🔍 DEBUG: Icebreaker length: %s chars", len(data['icebreaker']))
             
             # Use upsert to prevent duplicates - conflict on raw_contact_id
+            rate_limiter.wait_for_supabase()
             result = self.client.table("processed_leads").upsert(data, on_conflict="raw_contact_id").execute()
             
             if result.data:
@@ -524,6 +655,77 @@ class SupabaseManager:
             logging.error(f"🔍 DEBUG: Full traceback: {traceback.format_exc()}")
             return {}
 
+    def bulk_create_processed_leads(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Store many processed leads in one request
+
+        Args:
+            rows: Rows built with build_processed_lead_row
+
+        Returns:
+            The stored rows (falls back to one upsert per row if the bulk request fails)
+        """
+        if not rows:
+            return []
+
+        try:
+            # Use upsert to prevent duplicates - conflict on raw_contact_id
+            rate_limiter.wait_for_supabase()
+            stored = self._bulk_upsert("processed_leads", rows, on_conflict="raw_contact_id")
+            logging.info(f"✅ SUCCESS: Stored {len(stored)}/{len(rows)} processed leads in one request")
+            return stored
+
+        except Exception as e:
+            logging.warning(f"⚠️ Bulk processed lead insert failed ({e}), trying individual inserts")
+            stored = []
+            for row in rows:
+                try:
+                    rate_limiter.wait_for_supabase()
+                    result = self.client.table("processed_leads").upsert(row, on_conflict="raw_contact_id").execute()
+                    stored.extend(result.data or [])
+                except Exception as row_error:
+                    logging.warning(f"⚠️ Skipping lead for raw contact {row.get('raw_contact_id')}: {str(row_error)[:100]}")
+            return stored
+
+    # Website Summaries Cache
+    def get_cached_website_summaries(self, domains: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Look up AI website summaries stored by earlier runs, keyed by canonical domain"""
+        if not domains:
+            return {}
+
+        try:
+            # Entries older than the TTL are ignored so changed websites get re-summarized
+            fresh_since = datetime.now() - timedelta(days=config.WEBSITE_SUMMARY_CACHE_TTL_DAYS)
+            rate_limiter.wait_for_supabase()
+            result = (
+                self.client.table("website_summaries_cache")
+                .select("domain, summaries")
+                .in_("domain", domains)
+                .gte("updated_at", fresh_since.isoformat())
+                .execute()
+            )
+            return {row["domain"]: row.get("summaries") or [] for row in (result.data or [])}
+
+        except Exception as e:
+            logging.warning(f"⚠️ Could not read website summaries cache: {e}")
+            return {}
+
+    def cache_website_summaries(self, domain: str, website_url: str, summaries: List[Dict[str, Any]]) -> bool:
+        """Store a website's AI summaries so later runs can skip the scrape and summarization"""
+        try:
+            rate_limiter.wait_for_supabase()
+            self.client.table("website_summaries_cache").upsert({
+                "domain": domain,
+                "website_url": website_url,
+                "summaries": summaries,
+                "updated_at": datetime.now().isoformat()
+            }, on_conflict="domain").execute()
+            return True
+
+        except Exception as e:
+            logging.warning(f"⚠️ Could not write website summaries cache for {domain}: {e}")
+            return False
+
     def get_processed_leads(self, status: str = None, limit: int = 100) -> List[Dict[str, Any]]:
         """Get processed leads, optionally filtered by status (within organization context)"""
         try:
@@ -669,4 +871,75 @@ class SupabaseManager:
             
         except Exception as e:
             logging.error(f"Error exporting leads: {e}")
-            return []
\ No newline at end of file
+            return []
+
+
+class BackgroundLeadWriter:
+    """
+    Store processed leads from a background thread so database round trips
+    overlap with scraping and AI generation instead of blocking them
+    """
+    _STOP = object()
+
+    def __init__(self, supabase_manager: SupabaseManager, batch_size: int = config.DATABASE_BATCH_SIZE,
+                 flush_interval: float = 2.0, max_queue_size: int = 500):
+        """
+        Args:
+            supabase_manager: Manager used for the bulk upserts
+            batch_size: Maximum leads written per request
+            flush_interval: Maximum seconds a queued lead waits before being written
+            max_queue_size: Producers block once this many leads are waiting
+        """
+        self.supabase_manager = supabase_manager
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_queue_size)
+        self.leads_created = 0
+        self._thread = threading.Thread(target=self._run, name="lead-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, row: Dict[str, Any]):
+        """Queue a row built with SupabaseManager.build_processed_lead_row"""
+        self.queue.put(row)
+
+    def close(self) -> int:
+        """Write everything still queued, stop the thread and return the number of leads stored"""
+        self.queue.put(self._STOP)
+        self._thread.join()
+        return self.leads_created
+
+    def _run(self):
+        stop = False
+        while not stop:
+            item = self.queue.get()
+            if item is self._STOP:
+                break
+
+            # Collect up to batch_size rows or whatever arrives within flush_interval
+            rows = [item]
+            deadline = time.time() + self.flush_interval
+            while len(rows) < self.batch_size:
+                timeout = deadline - time.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stop = True
+                    break
+                rows.append(item)
+
+            self._flush(rows)
+
+    def _flush(self, rows: List[Dict[str, Any]]):
+        try:
+            logging.info(f"💾 Storing {len(rows)} leads in database")
+            created_leads = self.supabase_manager.bulk_create_processed_leads(rows)
+            self.supabase_manager.mark_contacts_processed_bulk(
+                [lead["raw_contact_id"] for lead in created_leads if lead.get("raw_contact_id")]
+            )
+            self.leads_created += len(created_leads)
+        except Exception as e:
+            logging.error(f"❌ Error storing queued leads: {e}")
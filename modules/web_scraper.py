@@ -11,9 +11,10 @@ from markdownify import markdownify as md
 from urllib.parse import urljoin, urlparse
 from config import (
     USER_AGENTS, REQUEST_TIMEOUT, MAX_RETRIES, DELAY_BETWEEN_REQUESTS,
-    MAX_LINKS_PER_SITE, WEBSITE_TIMEOUT, WEBSITE_MAX_RETRIES,
-    MAX_WEBSITE_WORKERS, ENABLE_PARALLEL_PROCESSING
+    MAX_LINKS_PER_SITE, WEBSITE_TIMEOUT, WEBSITE_CONNECT_TIMEOUT, WEBSITE_MAX_RETRIES,
+    MAX_WEBSITE_WORKERS, ENABLE_PARALLEL_PROCESSING, WEBSITE_POOL_CONNECTIONS, WEBSITE_POOL_MAXSIZE
 )
+from requests.adapters import HTTPAdapter
 from .rate_limiter import rate_limiter
 
 # High-value pages to prioritize for scraping
@@ -24,9 +25,45 @@ HIGH_VALUE_PAGES = [
     '/services', '/what-we-do', '/our-services',
 ]
 
+
+def canonical_website_key(website_url: str) -> str:
+    """Normalize a website URL to the domain used as its cache key (scheme, www. and path dropped)"""
+    if not website_url:
+        return ""
+    url = website_url.strip()
+    if '://' not in url:
+        url = f"http://{url}"
+    domain = urlparse(url).netloc.lower().split('@')[-1].split(':')[0]
+    if domain.startswith('www.'):
+        domain = domain[4:]
+    return domain
+
+def create_scraper_session() -> requests.Session:
+    """Create a pooled keep-alive session with the browser headers shared by every page request"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=WEBSITE_POOL_CONNECTIONS, pool_maxsize=WEBSITE_POOL_MAXSIZE)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.5',
+        'Accept-Encoding': 'gzip, deflate',
+        'Connection': 'keep-alive',
+    })
+    return session
+
 class WebScraper:
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(self, session: Optional[requests.Session] = None):
+        # One pooled session: sub-pages of a site reuse the same keep-alive connection
+        # (no new TCP/TLS handshake per page) and many sites can be open at once.
+        # Pass a session to share one pool between several scrapers.
+        self._owns_session = session is None
+        self.session = session if session is not None else create_scraper_session()
+
+    def close(self):
+        """Close the pooled connections (a session passed in by the caller is left open)"""
+        if self._owns_session:
+            self.session.close()
         
     def scrape_website_content(self, website_url: str) -> Dict[str, Any]:
         """
@@ -46,7 +83,7 @@ class WebScraper:
                 logging.warning(f"Domain {domain} is blocked due to repeated failures")
                 return self._empty_result()
 
-            logging.info(f"Starting website research for: {website_url}")
+            logging.info("Starting website research for: %s", website_url)
 
             # Step 1: Scrape the homepage with domain throttling
             homepage_content = self._scrape_page_with_throttle(website_url)
@@ -54,12 +91,14 @@ class WebScraper:
                 return self._empty_result()
 
             # Step 2: Extract structured data from homepage (JSON-LD, phone, social)
-            structured_data = self._extract_structured_data(homepage_content)
-            phone_numbers = self._extract_phone_numbers(homepage_content)
-            social_links = self._extract_social_links(homepage_content, website_url)
+            # The homepage is parsed once and the tree shared by every extractor
+            homepage_soup = BeautifulSoup(homepage_content, 'html.parser')
+            structured_data = self._extract_structured_data(homepage_content, homepage_soup)
+            phone_numbers = self._extract_phone_numbers(homepage_content, homepage_soup)
+            social_links = self._extract_social_links(homepage_content, website_url, homepage_soup)
 
             # Step 3: Extract internal links
-            internal_links = self._extract_internal_links(homepage_content, website_url)
+            internal_links = self._extract_internal_links(homepage_content, website_url, homepage_soup)
 
             # Step 4: Prioritize high-value pages (about, team, contact, services)
             prioritized_links = self._prioritize_links(internal_links)
@@ -76,25 +115,23 @@ class WebScraper:
             else:
                 page_summaries = self._scrape_pages_sequential(website_url, limited_links)
 
-            logging.info(f"Successfully scraped {len(page_summaries)} pages from {website_url}")
+            logging.info("Successfully scraped %s pages from %s", len(page_summaries), website_url)
 
             # Step 7: Extract emails and phones from all content
             all_emails = self._extract_emails_from_content(homepage_content)
             for summary in page_summaries:
                 if 'content' in summary:
                     all_emails.extend(self._extract_emails_from_content(summary['content']))
-                    phone_numbers.extend(self._extract_phone_numbers(summary.get('raw_html', '')))
+                    phone_numbers.extend(summary.get('phone_numbers', []))
 
             # Deduplicate
             unique_emails = list(set(all_emails))
             unique_phones = list(set(phone_numbers))
 
-            # Step 8: Extract team members if we found a team page
+            # Step 8: Collect team members found on team/about pages
             team_members = []
             for summary in page_summaries:
-                url_lower = summary.get('url', '').lower()
-                if any(kw in url_lower for kw in ['team', 'staff', 'people', 'leadership', 'about']):
-                    team_members.extend(self._extract_team_members(summary.get('raw_html', '')))
+                team_members.extend(summary.get('team_members', []))
 
             return {
                 "links": limited_links,
@@ -112,6 +149,38 @@ class WebScraper:
             rate_limiter.mark_website_failed(domain)
             return self._empty_result()
 
+    def scrape_websites(self, website_urls: List[str], max_workers: int = MAX_WEBSITE_WORKERS) -> Dict[str, Dict[str, Any]]:
+        """
+        Scrape many websites concurrently (domain throttling still applies per host)
+
+        Args:
+            website_urls: Website URLs to scrape; duplicates are fetched once
+            max_workers: Maximum number of websites fetched at the same time
+
+        Returns:
+            Dictionary mapping each website URL to its scrape_website_content result
+        """
+        unique_urls = list(dict.fromkeys(url for url in website_urls if url))
+        if not unique_urls:
+            return {}
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(unique_urls))) as executor:
+            future_to_url = {
+                executor.submit(self.scrape_website_content, url): url
+                for url in unique_urls
+            }
+
+            for future in as_completed(future_to_url):
+                url = future_to_url[future]
+                try:
+                    results[url] = future.result()
+                except Exception as e:
+                    logging.error(f"Error scraping website {url}: {e}")
+                    results[url] = self._empty_result()
+
+        return results
+
     def _empty_result(self) -> Dict[str, Any]:
         """Return empty result structure"""
         return {
@@ -136,13 +205,7 @@ class WebScraper:
                 page_content = self._scrape_page_with_throttle(full_url)
 
                 if page_content:
-                    # Convert to markdown
-                    markdown_content = self._html_to_markdown(page_content)
-                    page_summaries.append({
-                        'url': full_url,
-                        'content': markdown_content,
-                        'raw_html': page_content,  # Keep raw HTML for extraction
-                    })
+                    page_summaries.append(self._parse_page(full_url, page_content))
             except Exception as e:
                 logging.warning(f"Failed to scrape {link}: {e}")
                 continue
@@ -159,13 +222,7 @@ class WebScraper:
                 page_content = self._scrape_page_with_throttle(full_url)
 
                 if page_content:
-                    # Convert to markdown
-                    markdown_content = self._html_to_markdown(page_content)
-                    page_summaries.append({
-                        'url': full_url,
-                        'content': markdown_content,
-                        'raw_html': page_content,  # Keep raw HTML for extraction
-                    })
+                    page_summaries.append(self._parse_page(full_url, page_content))
 
             except Exception as e:
                 logging.warning(f"Failed to scrape {link}: {e}")
@@ -173,6 +230,22 @@ class WebScraper:
 
         return page_summaries
 
+    def _parse_page(self, url: str, page_content: str) -> Dict[str, Any]:
+        """Parse a scraped page once and run every extractor on the same tree"""
+        soup = BeautifulSoup(page_content, 'html.parser')
+        page = {
+            'url': url,
+            'raw_html': page_content,  # Keep raw HTML for extraction
+            'phone_numbers': self._extract_phone_numbers(page_content, soup),
+            'team_members': [],
+        }
+        url_lower = url.lower()
+        if any(kw in url_lower for kw in ['team', 'staff', 'people', 'leadership', 'about']):
+            page['team_members'] = self._extract_team_members(page_content, soup)
+        # Markdown conversion strips elements from the tree, so it runs last
+        page['content'] = self._html_to_markdown(page_content, soup)
+        return page
+
     def _prioritize_links(self, links: List[str]) -> List[str]:
         """Prioritize high-value pages (about, team, contact) at the front"""
         high_value = []
@@ -188,11 +261,12 @@ class WebScraper:
         # Return high-value pages first, then regular pages
         return high_value + regular
 
-    def _extract_structured_data(self, html_content: str) -> Dict[str, Any]:
+    def _extract_structured_data(self, html_content: str, soup: Optional[BeautifulSoup] = None) -> Dict[str, Any]:
         """Extract JSON-LD/Schema.org structured data from HTML"""
         result = {}
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            if soup is None:
+                soup = BeautifulSoup(html_content, 'html.parser')
 
             # Find all JSON-LD script tags
             json_ld_scripts = soup.find_all('script', type='application/ld+json')
@@ -253,14 +327,14 @@ class WebScraper:
                     continue
 
             if result:
-                logging.info(f"Extracted structured data: {list(result.keys())}")
+                logging.info("Extracted structured data: %s", list(result.keys()))
 
         except Exception as e:
-            logging.debug(f"Error extracting structured data: {e}")
+            logging.debug("Error extracting structured data: %s", e)
 
         return result
 
-    def _extract_phone_numbers(self, html_content: str) -> List[str]:
+    def _extract_phone_numbers(self, html_content: str, soup: Optional[BeautifulSoup] = None) -> List[str]:
         """Extract phone numbers from HTML content"""
         phones = []
         try:
@@ -279,7 +353,8 @@ class WebScraper:
                         phones.append(clean_phone)
 
             # Also check href="tel:" links
-            soup = BeautifulSoup(html_content, 'html.parser')
+            if soup is None:
+                soup = BeautifulSoup(html_content, 'html.parser')
             tel_links = soup.find_all('a', href=re.compile(r'^tel:', re.I))
             for link in tel_links:
                 phone = link.get('href', '').replace('tel:', '').strip()
@@ -288,15 +363,16 @@ class WebScraper:
                     phones.append(clean_phone)
 
         except Exception as e:
-            logging.debug(f"Error extracting phone numbers: {e}")
+            logging.debug("Error extracting phone numbers: %s", e)
 
         return list(set(phones))  # Deduplicate
 
-    def _extract_social_links(self, html_content: str, base_url: str) -> Dict[str, str]:
+    def _extract_social_links(self, html_content: str, base_url: str, soup: Optional[BeautifulSoup] = None) -> Dict[str, str]:
         """Extract social media links from HTML"""
         social = {}
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            if soup is None:
+                soup = BeautifulSoup(html_content, 'html.parser')
 
             # Social media patterns
             social_patterns = {
@@ -320,18 +396,19 @@ class WebScraper:
                                 social[platform] = href.split('?')[0]  # Remove query params
                             else:
                                 social[platform] = f"https://{match.group()}"
-                            logging.debug(f"Found {platform}: {social[platform]}")
+                            logging.debug("Found %s: %s", platform, social[platform])
 
         except Exception as e:
-            logging.debug(f"Error extracting social links: {e}")
+            logging.debug("Error extracting social links: %s", e)
 
         return social
 
-    def _extract_team_members(self, html_content: str) -> List[Dict[str, str]]:
+    def _extract_team_members(self, html_content: str, soup: Optional[BeautifulSoup] = None) -> List[Dict[str, str]]:
         """Extract team member names and titles from team/about pages"""
         team = []
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            if soup is None:
+                soup = BeautifulSoup(html_content, 'html.parser')
 
             # Common patterns for team member cards/sections
             # Look for elements with common team-related classes
@@ -388,12 +465,12 @@ class WebScraper:
                     unique_team.append(member)
 
             if unique_team:
-                logging.info(f"Extracted {len(unique_team)} team members")
+                logging.info("Extracted %s team members", len(unique_team))
 
             return unique_team
 
         except Exception as e:
-            logging.debug(f"Error extracting team members: {e}")
+            logging.debug("Error extracting team members: %s", e)
             return []
     
     def _scrape_page_with_throttle(self, url: str) -> Optional[str]:
@@ -412,13 +489,8 @@ class WebScraper:
     def _scrape_page(self, url: str) -> Optional[str]:
         """Scrape a single page and return HTML content"""
         try:
-            headers = {
-                'User-Agent': random.choice(USER_AGENTS),
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Accept-Encoding': 'gzip, deflate',
-                'Connection': 'keep-alive',
-            }
+            # The remaining browser headers are set once on the session
+            headers = {'User-Agent': random.choice(USER_AGENTS)}
             
             response = self._make_request_with_retry(url, headers=headers)
             
@@ -439,7 +511,8 @@ class WebScraper:
                 response = self.session.get(
                     url, 
                     headers=headers, 
-                    timeout=WEBSITE_TIMEOUT,  # Use website-specific timeout (10s instead of 1800s)
+                    # Dead hosts fail on the short connect timeout instead of waiting out the read timeout
+                    timeout=(WEBSITE_CONNECT_TIMEOUT, WEBSITE_TIMEOUT),
                     allow_redirects=True
                 )
                 
@@ -463,10 +536,11 @@ class WebScraper:
         
         return None
     
-    def _extract_internal_links(self, html_content: str, base_url: str) -> List[str]:
+    def _extract_internal_links(self, html_content: str, base_url: str, soup: Optional[BeautifulSoup] = None) -> List[str]:
         """Extract internal links from HTML content"""
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            if soup is None:
+                soup = BeautifulSoup(html_content, 'html.parser')
             links = []
             base_domain = urlparse(base_url).netloc
             
@@ -568,11 +642,12 @@ class WebScraper:
             logging.warning(f"Error extracting emails: {e}")
             return []
     
-    def _html_to_markdown(self, html_content: str) -> str:
-        """Convert HTML content to markdown"""
+    def _html_to_markdown(self, html_content: str, soup: Optional[BeautifulSoup] = None) -> str:
+        """Convert HTML content to markdown (removes script/style/nav elements from a passed-in soup)"""
         try:
             # Clean up HTML first
-            soup = BeautifulSoup(html_content, 'html.parser')
+            if soup is None:
+                soup = BeautifulSoup(html_content, 'html.parser')
             
             # Remove script and style elements
             for script in soup(["script", "style", "nav", "footer", "header"]):
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The repo root holds config.py and the modules package; make them importable from tests/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,168 @@
+"""Tests for AIProcessor's prompt helpers and reply handling"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("httpx")
+
+from modules import ai_processor
+from modules.ai_processor import (
+    AIProcessor,
+    _FORBIDDEN_SUBJECT_PATTERNS,
+    _FORBIDDEN_SUBJECT_RE,
+    _SUBJECT_LINE_RULES,
+    _fill_template_variables,
+)
+
+
+def test_fill_template_variables_replaces_every_placeholder():
+    prompt = "Write to {{company_name}} ({{business_type}}) in {{location}}. About {{company_name}}: {{website_summaries}}"
+    values = {
+        'company_name': "Joe's Coffee",
+        'business_type': 'cafe',
+        'location': 'Austin, TX',
+        'website_summaries': 'Roasts its own beans',
+    }
+    assert _fill_template_variables(prompt, values) == (
+        "Write to Joe's Coffee (cafe) in Austin, TX. About Joe's Coffee: Roasts its own beans"
+    )
+
+
+def test_fill_template_variables_leaves_unknown_placeholders():
+    assert _fill_template_variables("Hi {{first_name}} at {{company_name}}", {'company_name': 'Maki'}) == (
+        "Hi {{first_name}} at Maki"
+    )
+
+
+def test_fill_template_variables_does_not_rescan_substituted_text():
+    # A value that itself looks like a placeholder is inserted verbatim
+    assert _fill_template_variables("{{website_summaries}}", {'website_summaries': '{{location}}', 'location': 'x'}) == (
+        "{{location}}"
+    )
+
+
+@pytest.mark.parametrize("subject", [
+    "Re: your cafe",
+    "FWD: menu ideas",
+    "Fw: menu ideas",
+    "Quick Q for Joe's Coffee",
+    "quick question about your site",
+    "Question about Maki",
+    "Inquiry for Joe's Coffee",
+    "Regarding your website",
+    "Joe's website",
+    "Hello from Austin",
+    "Hi there",
+])
+def test_forbidden_subject_re_rejects_rulebook_patterns(subject):
+    assert _FORBIDDEN_SUBJECT_RE.search(subject)
+
+
+@pytest.mark.parametrize("subject", [
+    "White-label demos for Maki",
+    "Joe's Coffee → more walk-ins",
+    "Your restaurant's Google ranking",
+    "A cafe idea for Joe's Coffee",
+    "Reviews that bring regulars back",
+])
+def test_forbidden_subject_re_allows_good_subjects(subject):
+    assert not _FORBIDDEN_SUBJECT_RE.search(subject)
+
+
+def test_subject_line_rules_list_every_forbidden_pattern():
+    for description, _ in _FORBIDDEN_SUBJECT_PATTERNS:
+        assert f"- {description}" in _SUBJECT_LINE_RULES
+
+
+def _reply(content):
+    """A chat completion response carrying the given message content"""
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+@pytest.fixture
+def processor():
+    processor = AIProcessor(api_key="test")
+    yield processor
+    processor.close()
+
+
+def test_summarize_page_group_uses_combined_abstracts(processor, monkeypatch):
+    monkeypatch.setattr(processor, "_chat_completion",
+                        lambda **kwargs: _reply(json.dumps({"abstracts": ["about page", "menu page"]})))
+    monkeypatch.setattr(processor, "_generate_page_summary", lambda content: pytest.fail("per-page fallback used"))
+
+    assert processor._summarize_page_group(["About us", "Our menu"]) == ["about page", "menu page"]
+
+
+@pytest.mark.parametrize("content", [
+    json.dumps({"abstracts": ["only one"]}),
+    json.dumps({"abstracts": ["one", "two", "three"]}),
+    json.dumps({"abstract": "wrong key"}),
+    "not json",
+])
+def test_summarize_page_group_falls_back_per_page(processor, monkeypatch, content):
+    monkeypatch.setattr(processor, "_chat_completion", lambda **kwargs: _reply(content))
+    monkeypatch.setattr(processor, "_generate_page_summary", lambda content: f"summary of {content}")
+
+    assert processor._summarize_page_group(["About us", "Our menu"]) == ["summary of About us", "summary of Our menu"]
+
+
+def test_summarize_page_group_single_page_skips_combined_request(processor, monkeypatch):
+    monkeypatch.setattr(processor, "_generate_page_summaries", lambda contents: pytest.fail("combined request made"))
+    monkeypatch.setattr(processor, "_generate_page_summary", lambda content: f"summary of {content}")
+
+    assert processor._summarize_page_group(["About us"]) == ["summary of About us"]
+
+
+def _contact(**fields):
+    contact = {
+        'first_name': 'Joe',
+        'last_name': 'Smith',
+        'email': 'joe@joescoffee.com',
+        'headline': 'Owner',
+        'company_name': "Joe's Coffee",
+        'website_url': 'https://joescoffee.com',
+        'website_summaries': ['Roasts its own beans'],
+    }
+    contact.update(fields)
+    return contact
+
+
+def test_contact_identity_ignores_website_content_and_url_formatting():
+    assert AIProcessor._contact_identity(_contact()) == AIProcessor._contact_identity(
+        _contact(email='Joe@JoesCoffee.com', website_url='https://JoesCoffee.com/', website_summaries=['Open late'])
+    )
+
+
+@pytest.mark.parametrize("field, value", [
+    ('first_name', 'Ann'),
+    ('headline', 'Barista'),
+    ('email', 'ann@joescoffee.com'),
+])
+def test_contact_identity_tells_people_apart(field, value):
+    assert AIProcessor._contact_identity(_contact()) != AIProcessor._contact_identity(_contact(**{field: value}))
+
+
+def test_contact_identity_none_without_email_or_website():
+    assert AIProcessor._contact_identity(_contact(email=None, website_url='')) is None
+
+
+def test_icebreaker_response_format_uses_schema_for_supported_models(monkeypatch):
+    monkeypatch.setattr(ai_processor, "AI_BASE_URL", "")
+
+    assert AIProcessor._icebreaker_response_format("gpt-4o-mini")["type"] == "json_schema"
+    with_summary = AIProcessor._icebreaker_response_format("gpt-4o-mini", with_website_summary=True)
+    assert "website_summary" in with_summary["json_schema"]["schema"]["properties"]
+
+
+@pytest.mark.parametrize("model, base_url", [
+    ("gpt-3.5-turbo", ""),
+    ("gpt-4o-mini", "http://localhost:8000/v1"),
+])
+def test_icebreaker_response_format_falls_back_to_json_mode(monkeypatch, model, base_url):
+    monkeypatch.setattr(ai_processor, "AI_BASE_URL", base_url)
+
+    assert AIProcessor._icebreaker_response_format(model) == {"type": "json_object"}
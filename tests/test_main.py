@@ -0,0 +1,87 @@
+"""Tests for the cached connection health check"""
+
+import pytest
+
+for dependency in ("requests", "bs4", "markdownify", "openai", "httpx", "supabase"):
+    pytest.importorskip(dependency)
+
+import config
+from main import LeadGenerationOrchestrator
+
+
+class _FakeService:
+    def __init__(self, connected=True):
+        self.connected = connected
+        self.calls = 0
+
+    def test_connection(self):
+        self.calls += 1
+        return self.connected
+
+
+@pytest.fixture
+def healthcheck_file(tmp_path, monkeypatch):
+    path = tmp_path / "healthcheck.json"
+    monkeypatch.setattr(config, "HEALTHCHECK_CACHE_FILE", str(path))
+    monkeypatch.setattr(config, "HEALTHCHECK_CACHE_TTL", 300)
+    return path
+
+
+def _orchestrator(connected=True):
+    orchestrator = LeadGenerationOrchestrator.__new__(LeadGenerationOrchestrator)
+    orchestrator.use_supabase = False
+    orchestrator.supabase_manager = None
+    orchestrator.apify_scraper = _FakeService(connected)
+    orchestrator.local_scraper = _FakeService()
+    orchestrator.ai_processor = _FakeService()
+    return orchestrator
+
+
+def test_passed_health_check_is_reused(healthcheck_file):
+    orchestrator = _orchestrator()
+
+    assert orchestrator.test_connections()
+    assert orchestrator.test_connections()
+    assert orchestrator.apify_scraper.calls == 1
+    assert healthcheck_file.exists()
+
+
+def test_force_reruns_a_cached_health_check(healthcheck_file):
+    orchestrator = _orchestrator()
+    orchestrator.test_connections()
+
+    assert orchestrator.test_connections(force=True)
+    assert orchestrator.apify_scraper.calls == 2
+
+
+def test_failed_health_check_is_not_cached(healthcheck_file):
+    orchestrator = _orchestrator(connected=False)
+
+    assert not orchestrator.test_connections()
+    assert not orchestrator.test_connections()
+    assert orchestrator.apify_scraper.calls == 2
+    assert not healthcheck_file.exists()
+
+
+def test_cached_health_check_expires(healthcheck_file, monkeypatch):
+    orchestrator = _orchestrator()
+    orchestrator.test_connections()
+    monkeypatch.setattr(config, "HEALTHCHECK_CACHE_TTL", 0)
+
+    orchestrator.test_connections()
+    assert orchestrator.apify_scraper.calls == 2
+
+
+def test_cached_health_check_is_tied_to_the_credentials(healthcheck_file, monkeypatch):
+    orchestrator = _orchestrator()
+    orchestrator.test_connections()
+    monkeypatch.setattr(config, "OPENAI_API_KEY", "sk-other")
+
+    orchestrator.test_connections()
+    assert orchestrator.apify_scraper.calls == 2
+
+
+def test_unreadable_health_check_cache_is_ignored(healthcheck_file):
+    healthcheck_file.write_text("not json")
+
+    assert not _orchestrator()._healthcheck_cached("any key")
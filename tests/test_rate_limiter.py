@@ -0,0 +1,86 @@
+"""Tests for the rate limiter's header parsing and limiters"""
+
+import threading
+
+import pytest
+
+from modules.rate_limiter import AdaptiveConcurrencyLimiter, parse_reset_duration, retry_after_seconds
+
+
+@pytest.mark.parametrize("value, seconds", [
+    ("1s", 1.0),
+    ("6m0s", 360.0),
+    ("120ms", 0.12),
+    ("1h2m3.5s", 3723.5),
+    ("0.5s", 0.5),
+])
+def test_parse_reset_duration(value, seconds):
+    assert parse_reset_duration(value) == pytest.approx(seconds)
+
+
+@pytest.mark.parametrize("value", ["", None, "soon"])
+def test_parse_reset_duration_without_a_duration_is_zero(value):
+    assert parse_reset_duration(value) == 0
+
+
+class _ApiError(Exception):
+    """Shape of an OpenAI APIStatusError: the HTTP response hangs off .response"""
+    def __init__(self, headers):
+        super().__init__("rate limited")
+        self.response = type("Response", (), {"headers": headers})()
+
+
+def test_retry_after_seconds_prefers_milliseconds_header():
+    assert retry_after_seconds(_ApiError({"retry-after-ms": "1500", "retry-after": "9"})) == pytest.approx(1.5)
+
+
+def test_retry_after_seconds_reads_seconds_header():
+    assert retry_after_seconds(_ApiError({"retry-after": "7"})) == 7.0
+
+
+@pytest.mark.parametrize("error", [
+    ValueError("no response"),
+    _ApiError({}),
+    _ApiError({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}),
+])
+def test_retry_after_seconds_without_a_usable_header(error):
+    assert retry_after_seconds(error) is None
+
+
+def test_concurrency_limit_halves_on_overload_down_to_the_floor():
+    limiter = AdaptiveConcurrencyLimiter(max_limit=8, min_limit=2)
+    for expected in (4, 2, 2):
+        limiter.acquire()
+        limiter.release(latency=0.1, overloaded=True)
+        assert limiter.limit == expected
+
+
+def test_concurrency_limit_grows_additively_up_to_the_max():
+    limiter = AdaptiveConcurrencyLimiter(max_limit=4, latency_target=1.0, increase=0.5)
+    limiter.limit = 2.0
+    for expected in (2.5, 3.0, 3.5, 4.0, 4.0):
+        limiter.acquire()
+        limiter.release(latency=0.5)
+        assert limiter.limit == expected
+
+
+def test_concurrency_limit_holds_for_slow_successes():
+    limiter = AdaptiveConcurrencyLimiter(max_limit=4, latency_target=1.0)
+    limiter.limit = 2.0
+    limiter.acquire()
+    limiter.release(latency=5.0)
+    assert limiter.limit == 2.0
+
+
+def test_acquire_blocks_at_the_limit_until_a_release():
+    limiter = AdaptiveConcurrencyLimiter(max_limit=1)
+    limiter.acquire()
+    acquired = threading.Event()
+    waiter = threading.Thread(target=lambda: (limiter.acquire(), acquired.set()))
+    waiter.start()
+    assert not acquired.wait(0.1)
+
+    limiter.release(latency=0.1)
+    assert acquired.wait(1)
+    waiter.join()
+    assert limiter.in_flight == 1
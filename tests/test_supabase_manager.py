@@ -0,0 +1,201 @@
+"""Tests for contact paging and the background lead writer"""
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("supabase")
+
+from modules.supabase_manager import BackgroundLeadWriter, SupabaseManager
+
+
+class _FakeQuery:
+    """The slice of the PostgREST query builder SupabaseManager uses, run against in-memory rows"""
+
+    def __init__(self, rows):
+        self._rows = rows
+        self._filters = []
+        self._negate = False
+        self._order = None
+        self._limit = None
+        self._update = None
+
+    def _filter(self, test):
+        negate, self._negate = self._negate, False
+        self._filters.append((lambda row: not test(row)) if negate else test)
+        return self
+
+    @property
+    def not_(self):
+        self._negate = True
+        return self
+
+    def select(self, *columns):
+        return self
+
+    def update(self, values):
+        self._update = values
+        return self
+
+    def eq(self, column, value):
+        return self._filter(lambda row: row.get(column) == value)
+
+    def neq(self, column, value):
+        return self._filter(lambda row: row.get(column) != value)
+
+    def gt(self, column, value):
+        return self._filter(lambda row: row.get(column) > value)
+
+    def is_(self, column, value):
+        return self._filter(lambda row: row.get(column) is None)
+
+    def in_(self, column, values):
+        return self._filter(lambda row: row.get(column) in values)
+
+    def order(self, column):
+        self._order = column
+        return self
+
+    def limit(self, count):
+        self._limit = count
+        return self
+
+    def execute(self):
+        rows = [row for row in self._rows if all(test(row) for test in self._filters)]
+        if self._update is not None:
+            for row in rows:
+                row.update(self._update)
+        if self._order:
+            rows.sort(key=lambda row: row[self._order])
+        if self._limit is not None:
+            rows = rows[:self._limit]
+        return SimpleNamespace(data=[dict(row) for row in rows])
+
+
+class _FakeClient:
+    def __init__(self, **tables):
+        self.tables = tables
+
+    def table(self, name):
+        return _FakeQuery(self.tables.setdefault(name, []))
+
+
+def _raw_contact(contact_id, email):
+    return {
+        'id': contact_id,
+        'email': email,
+        'email_status': 'verified',
+        'website_url': 'https://example.com',
+        'processed': False,
+    }
+
+
+def _manager(raw_contacts, processed_leads=()):
+    manager = SupabaseManager.__new__(SupabaseManager)
+    manager.organization_id = None
+    manager.client = _FakeClient(raw_contacts=list(raw_contacts), processed_leads=list(processed_leads))
+    return manager
+
+
+def test_contact_pages_continue_after_the_cursor():
+    manager = _manager([_raw_contact(f"0{i}", f"person{i}@example.com") for i in range(1, 6)])
+
+    # Nothing is marked processed between pages, as while leads are still being written
+    pages = []
+    contacts, cursor = manager.get_unprocessed_contacts_page(limit=2)
+    while contacts:
+        pages.append([contact['id'] for contact in contacts])
+        contacts, cursor = manager.get_unprocessed_contacts_page(limit=2, after_id=cursor)
+
+    assert pages == [['01', '02'], ['03', '04'], ['05']]
+    assert cursor == '05'
+
+
+def test_contact_page_drops_duplicate_emails():
+    manager = _manager(
+        [
+            _raw_contact('01', 'joe@example.com'),
+            _raw_contact('02', 'Joe@Example.com'),
+            _raw_contact('03', 'ann@example.com'),
+        ],
+        processed_leads=[{'email': 'ann@example.com'}],
+    )
+
+    contacts, cursor = manager.get_unprocessed_contacts_page(limit=10)
+
+    assert [contact['id'] for contact in contacts] == ['01']
+    assert cursor == '03'
+    processed = {row['id']: row['processed'] for row in manager.client.tables['raw_contacts']}
+    # Only the contact whose email already has a lead is marked; the in-page repeat stays queued
+    assert processed == {'01': False, '02': False, '03': True}
+
+
+def test_contact_page_skips_past_pages_of_only_duplicates():
+    manager = _manager(
+        [_raw_contact('01', 'ann@example.com'), _raw_contact('02', 'joe@example.com')],
+        processed_leads=[{'email': 'ann@example.com'}],
+    )
+
+    contacts, cursor = manager.get_unprocessed_contacts_page(limit=1)
+
+    assert [contact['id'] for contact in contacts] == ['02']
+    assert cursor == '02'
+
+
+class _FakeLeadStore:
+    """Stands in for SupabaseManager in the lead writer, recording each bulk write"""
+
+    def __init__(self, fail_first=False):
+        self.batches = []
+        self.marked = []
+        self.fail_first = fail_first
+        self.written = threading.Event()
+
+    def bulk_create_processed_leads(self, rows):
+        if self.fail_first:
+            self.fail_first = False
+            raise RuntimeError("database unavailable")
+        self.batches.append(list(rows))
+        self.written.set()
+        return rows
+
+    def mark_contacts_processed_bulk(self, contact_ids):
+        self.marked.extend(contact_ids)
+        return len(contact_ids)
+
+
+def _lead(number):
+    return {'raw_contact_id': f"raw-{number}"}
+
+
+def test_lead_writer_batches_rows_and_flushes_on_close():
+    store = _FakeLeadStore()
+    writer = BackgroundLeadWriter(store, batch_size=2, flush_interval=60)
+    for number in range(5):
+        writer.submit(_lead(number))
+
+    assert writer.close() == 5
+    assert [len(batch) for batch in store.batches] == [2, 2, 1]
+    assert store.marked == [f"raw-{number}" for number in range(5)]
+
+
+def test_lead_writer_flushes_after_the_interval():
+    store = _FakeLeadStore()
+    writer = BackgroundLeadWriter(store, batch_size=100, flush_interval=0.05)
+    writer.submit(_lead(1))
+
+    assert store.written.wait(timeout=5)
+    assert store.batches == [[_lead(1)]]
+    assert writer.close() == 1
+
+
+def test_lead_writer_keeps_running_after_a_failed_write():
+    store = _FakeLeadStore(fail_first=True)
+    writer = BackgroundLeadWriter(store, batch_size=1, flush_interval=60)
+    writer.submit(_lead(1))
+    writer.submit(_lead(2))
+
+    assert writer.close() == 1
+    assert store.batches == [[_lead(2)]]
+    assert store.marked == ["raw-2"]
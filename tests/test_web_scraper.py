@@ -0,0 +1,28 @@
+"""Tests for website cache keys"""
+
+import pytest
+
+pytest.importorskip("bs4")
+pytest.importorskip("markdownify")
+
+from modules.web_scraper import canonical_website_key
+
+
+@pytest.mark.parametrize("url", [
+    "https://www.example.com",
+    "http://example.com/about-us",
+    "example.com",
+    "  HTTPS://WWW.Example.com:443/contact?ref=x  ",
+    "https://user@example.com/",
+])
+def test_canonical_website_key_reduces_urls_to_the_domain(url):
+    assert canonical_website_key(url) == "example.com"
+
+
+def test_canonical_website_key_keeps_subdomains_apart():
+    assert canonical_website_key("https://shop.example.com") == "shop.example.com"
+
+
+@pytest.mark.parametrize("url", ["", None])
+def test_canonical_website_key_of_a_missing_url_is_empty(url):
+    assert canonical_website_key(url) == ""